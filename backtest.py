@@ -0,0 +1,578 @@
+import argparse
+import asyncio
+import copy
+import csv
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+import config
+import dedupe_cache
+import handler_executor
+import message_parser
+import order_executor
+import order_ledger
+import position_tracker
+import strategy_engine
+
+ENDPOINTS = {
+    "/fbd": "handle_fbd_webhook",
+    "/gold": "handle_gold_webhook",
+    "/nq": "handle_nq_webhook",
+    "/gold-trend": "handle_gold_trend_webhook",
+}
+
+HANDLERS = {
+    "stopped": "handle_stopped_message",
+}
+
+STRATEGY_HANDLERS = {
+    "50_percent_target": "take_partial_profit",
+    "exit": "exit",
+}
+
+class SimulatedClock(datetime):
+    current = datetime(1970, 1, 1)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+class PriceSeries:
+    def __init__(self, timestamps: np.ndarray, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray):
+        order = np.argsort(timestamps, kind="stable")
+        self.timestamps = timestamps[order]
+        self.open = opens[order]
+        self.high = highs[order]
+        self.low = lows[order]
+        self.close = closes[order]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def index_at(self, timestamp: float) -> int:
+        return int(np.searchsorted(self.timestamps, timestamp, side="right")) - 1
+
+    def indices_at(self, timestamps: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.timestamps, timestamps, side="right") - 1
+
+    def first_touch(self, start: int, end: int, level: float, below: bool) -> Optional[int]:
+        if start > end:
+            return None
+        window = self.low[start:end + 1] <= level if below else self.high[start:end + 1] >= level
+        hits = np.flatnonzero(window)
+        return start + int(hits[0]) if hits.size else None
+
+@dataclass
+class Signal:
+    timestamp: float
+    endpoint: Optional[str] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+    handler: Optional[str] = None
+
+@dataclass
+class Fill:
+    time: datetime
+    ticker: str
+    side: str
+    quantity: int
+    price: float
+    operation_name: str
+    closed_quantity: int = 0
+    pnl_points: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time": self.time.isoformat(),
+            "ticker": self.ticker,
+            "side": self.side,
+            "quantity": self.quantity,
+            "price": self.price,
+            "operation": self.operation_name,
+            "closed_quantity": self.closed_quantity,
+            "pnl_points": self.pnl_points,
+        }
+
+@dataclass
+class RestingOrder:
+    ticker: str
+    side: str
+    quantity: int
+    order_type: str
+    level: float
+    operation_name: str
+    next_index: int = 0
+
+    @property
+    def triggers_below(self) -> bool:
+        return (self.side == "sell") == (self.order_type == "stop")
+
+class _MemoryStore:
+    def __init__(self):
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+
+    def read(self, path: str) -> Optional[Dict[str, Any]]:
+        snapshot = self.snapshots.get(path)
+        return copy.deepcopy(snapshot) if snapshot is not None else None
+
+    def write(self, path: str, data: Dict[str, Any]):
+        self.snapshots[path] = copy.deepcopy(data)
+
+    def delete(self, path: str):
+        self.snapshots.pop(path, None)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return True
+
+def _timestamp(value: Union[str, float, int]) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def _quantity(value: Any, default: int) -> int:
+    if value is None or value == "":
+        return default
+    return int(float(value))
+
+class SimulatedBroker:
+    def __init__(self, prices: Dict[str, PriceSeries], point_values: Optional[Dict[str, float]] = None):
+        self.prices = prices
+        self.point_values = dict(config.POINT_VALUES)
+        self.point_values.update(point_values or {})
+        self.positions: Dict[str, int] = {}
+        self.average_price: Dict[str, float] = {}
+        self.last_price: Dict[str, float] = {}
+        self.resting: Dict[str, List[RestingOrder]] = {}
+        self.fills: List[Fill] = []
+        self.orders = 0
+        self.brackets = 0
+        self.now = 0.0
+
+    def _bar_index(self, ticker: str) -> int:
+        series = self.prices.get(ticker)
+        return series.index_at(self.now) if series is not None else -1
+
+    def _market_price(self, ticker: str, payload: Dict) -> Optional[float]:
+        series = self.prices.get(ticker)
+        if series is not None:
+            index = series.index_at(self.now)
+            if index >= 0:
+                return float(series.close[index])
+        for key in ("price", "signalPrice", "stopPrice"):
+            value = payload.get(key)
+            if value not in (None, ""):
+                return float(value)
+        return self.last_price.get(ticker)
+
+    def _fill(self, ticker: str, side: str, quantity: int, price: float, operation_name: str):
+        if quantity <= 0:
+            return
+        signed = quantity if side == "buy" else -quantity
+        position = self.positions.get(ticker, 0)
+        average = self.average_price.get(ticker, 0.0)
+        closing = 0
+        pnl_points = 0.0
+        if position and (position > 0) != (signed > 0):
+            closing = min(abs(signed), abs(position))
+            pnl_points = closing * (price - average) * (1 if position > 0 else -1)
+            remaining = position + signed
+            if remaining and (remaining > 0) != (position > 0):
+                average = price
+            elif not remaining:
+                average = 0.0
+            position = remaining
+        else:
+            total = abs(position) + abs(signed)
+            average = (average * abs(position) + price * abs(signed)) / total
+            position += signed
+        self.positions[ticker] = position
+        self.average_price[ticker] = average
+        self.last_price[ticker] = price
+        self.fills.append(Fill(SimulatedClock.current, ticker, side, quantity, price, operation_name, closing, pnl_points))
+        if not position:
+            self.resting.pop(ticker, None)
+
+    def _rest(self, ticker: str, side: str, quantity: int, order_type: str, level: float, operation_name: str):
+        order = RestingOrder(ticker, side, quantity, order_type, level, operation_name, self._bar_index(ticker) + 1)
+        self.resting.setdefault(ticker, []).append(order)
+
+    def cancel(self, ticker: str):
+        self.resting.pop(ticker, None)
+
+    def flatten(self, ticker: str, payload: Dict, operation_name: str):
+        self.cancel(ticker)
+        position = self.positions.get(ticker, 0)
+        if position:
+            price = self._market_price(ticker, payload)
+            self._fill(ticker, "sell" if position > 0 else "buy", abs(position), price, operation_name)
+
+    def execute(self, payload: Dict, quantity: Optional[int], operation_name: str) -> order_executor.DispatchResult:
+        self.orders += 1
+        result = order_executor.DispatchResult(url="simulated", operation_name=operation_name, status="success", attempts=1)
+        ticker = payload.get("ticker", "")
+        action = payload.get("action", "")
+        size = _quantity(quantity if quantity is not None else payload.get("quantity"), config.GLOBAL_QUANTITY)
+        order_type = payload.get("orderType", "market")
+
+        if action == "cancel":
+            self.cancel(ticker)
+        elif action == "exit":
+            self.flatten(ticker, payload, operation_name)
+        elif order_type == "stop":
+            self._rest(ticker, action, size, "stop", float(payload["stopPrice"]), operation_name)
+        elif order_type == "limit":
+            self._rest(ticker, action, size, "limit", float(payload["price"]), operation_name)
+        else:
+            price = self._market_price(ticker, payload)
+            if price is None:
+                result.status = "rejected"
+                result.error = f"no price available for {ticker}"
+                return result
+            self._fill(ticker, action, size, price, operation_name)
+            exit_side = "sell" if action == "buy" else "buy"
+            direction = 1 if action == "buy" else -1
+            take_profit = payload.get("takeProfit")
+            if take_profit:
+                self._rest(ticker, exit_side, size, "limit", price + direction * float(take_profit["amount"]), f"{operation_name} take profit")
+            stop_loss = payload.get("stopLoss")
+            if stop_loss:
+                self._rest(ticker, exit_side, size, "stop", price - direction * float(stop_loss["amount"]), f"{operation_name} stop loss")
+        return result
+
+    def advance(self, timestamp: float):
+        for ticker in list(self.resting):
+            series = self.prices.get(ticker)
+            if series is None:
+                continue
+            end = series.index_at(timestamp)
+            while self.resting.get(ticker):
+                best_index = None
+                best_order = None
+                for order in self.resting[ticker]:
+                    index = series.first_touch(order.next_index, end, order.level, order.triggers_below)
+                    if index is None:
+                        continue
+                    if best_index is None or index < best_index or (index == best_index and order.order_type == "stop"):
+                        best_index = index
+                        best_order = order
+                if best_order is None:
+                    break
+                self._trigger(series, best_index, best_order)
+            for order in self.resting.get(ticker, []):
+                order.next_index = max(order.next_index, end + 1)
+        self.now = timestamp
+        SimulatedClock.current = datetime.fromtimestamp(timestamp)
+
+    def _trigger(self, series: PriceSeries, index: int, order: RestingOrder):
+        orders = self.resting[order.ticker]
+        orders.remove(order)
+        for other in orders:
+            other.next_index = max(other.next_index, index)
+        position = self.positions.get(order.ticker, 0)
+        reduces = position and (position > 0) == (order.side == "sell")
+        if not reduces:
+            return
+        bar_open = float(series.open[index])
+        if order.triggers_below:
+            price = min(order.level, bar_open)
+        else:
+            price = max(order.level, bar_open)
+        SimulatedClock.current = datetime.fromtimestamp(float(series.timestamps[index]))
+        self._fill(order.ticker, order.side, min(order.quantity, abs(position)), price, order.operation_name)
+
+    def submit_bracket(self, ticker: str, entry: order_executor.OrderLeg, exits: List[order_executor.OrderLeg], cancel: bool) -> order_executor.Bracket:
+        self.brackets += 1
+        bracket = order_executor.Bracket(bracket_id=f"sim-{self.brackets}", ticker=ticker, urls=["simulated"], created_at=self.now)
+        if cancel:
+            self.cancel(ticker)
+            bracket.results.append(order_executor.DispatchResult(url="simulated", operation_name="Cancel webhook", status="success", attempts=1))
+        entry_result = self.execute(entry.payload, entry.quantity, entry.operation_name)
+        bracket.results.append(entry_result)
+        if entry_result.ok:
+            for leg in exits:
+                bracket.results.append(self.execute(leg.payload, leg.quantity, leg.operation_name))
+        bracket.status = "completed" if all(result.ok for result in bracket.results) else "failed"
+        bracket.completed_at = self.now
+        return bracket
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        tickers = sorted({fill.ticker for fill in self.fills} | set(self.positions))
+        for ticker in tickers:
+            fills = [fill for fill in self.fills if fill.ticker == ticker]
+            point_value = self.point_values.get(ticker, 1.0)
+            closing = np.array([fill.pnl_points for fill in fills if fill.closed_quantity], dtype=float)
+            equity = np.cumsum(closing) * point_value
+            peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] if equity.size else equity
+            position = self.positions.get(ticker, 0)
+            last = self.last_price.get(ticker, 0.0)
+            series = self.prices.get(ticker)
+            if series is not None and len(series):
+                last = float(series.close[max(series.index_at(self.now), 0)])
+            unrealized = position * (last - self.average_price.get(ticker, 0.0)) * point_value if position else 0.0
+            report[ticker] = {
+                "fills": len(fills),
+                "closing_fills": int(closing.size),
+                "wins": int(np.count_nonzero(closing > 0)),
+                "losses": int(np.count_nonzero(closing < 0)),
+                "realized_points": float(closing.sum()),
+                "realized_pnl": float(equity[-1]) if equity.size else 0.0,
+                "max_drawdown": float((peak - equity).max()) if equity.size else 0.0,
+                "open_position": position,
+                "unrealized_pnl": unrealized,
+            }
+        return report
+
+@dataclass
+class BacktestResult:
+    signals: int
+    orders: int
+    fills: List[Fill]
+    summary: Dict[str, Dict[str, Any]]
+    overrides: Dict[str, Any]
+
+    def total_pnl(self) -> float:
+        return sum(ticker["realized_pnl"] + ticker["unrealized_pnl"] for ticker in self.summary.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "signals": self.signals,
+            "orders": self.orders,
+            "overrides": self.overrides,
+            "total_pnl": self.total_pnl(),
+            "instruments": self.summary,
+        }
+
+def _coerce(name: str, value: Any) -> Any:
+    current = getattr(config, name)
+    if not isinstance(value, str):
+        return value
+    if isinstance(current, bool):
+        return value.lower() == "true"
+    if isinstance(current, int):
+        return int(float(value))
+    if isinstance(current, float):
+        return float(value)
+    return value
+
+@contextmanager
+def simulation(broker: SimulatedBroker, overrides: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+    import main
+
+    def send_webhook(payload, url, quantity=None, operation_name="webhook", is_entry_trade=False, additional_context=None):
+        return broker.execute(payload, quantity, operation_name)
+
+    def send_webhook_to_multiple_urls(payload, urls, operation_name="webhook", quantity=None, is_entry_trade=False, additional_context=None, concurrent=True, deadline=None):
+        return [broker.execute(payload, quantity, operation_name)]
+
+    def send_cancel_webhook(ticker, url):
+        broker.cancel(ticker)
+        return order_executor.DispatchResult(url="simulated", operation_name="Cancel webhook", status="success", attempts=1)
+
+    def submit_bracket(ticker, urls, entry, exits=None, cancel=True, wait=False):
+        return broker.submit_bracket(ticker, entry, exits or [], cancel)
+
+    async def send_webhook_async(*args, **kwargs):
+        return send_webhook(*args, **kwargs)
+
+    async def send_webhook_to_multiple_urls_async(*args, **kwargs):
+        return send_webhook_to_multiple_urls(*args, **kwargs)
+
+    async def send_cancel_webhook_async(ticker, url):
+        return send_cancel_webhook(ticker, url)
+
+    async def submit_bracket_async(*args, **kwargs):
+        return submit_bracket(*args, **kwargs)
+
+    async def run_handler(func, *args):
+        return func(*args)
+
+    def signal_id(source, payload):
+        return source
+
+    patches = [
+        (order_executor, "send_webhook", send_webhook),
+        (order_executor, "send_webhook_to_multiple_urls", send_webhook_to_multiple_urls),
+        (order_executor, "send_cancel_webhook", send_cancel_webhook),
+        (order_executor, "submit_bracket", submit_bracket),
+        (order_executor, "send_webhook_async", send_webhook_async),
+        (order_executor, "send_webhook_to_multiple_urls_async", send_webhook_to_multiple_urls_async),
+        (order_executor, "send_cancel_webhook_async", send_cancel_webhook_async),
+        (order_executor, "submit_bracket_async", submit_bracket_async),
+        (position_tracker, "state_store", _MemoryStore()),
+        (position_tracker, "datetime", SimulatedClock),
+        (position_tracker, "_positions", {}),
+        (position_tracker, "_expires_at", {}),
+        (position_tracker, "_deadlines", []),
+        (position_tracker, "_clock", lambda: broker.now),
+        (position_tracker, "_loaded", True),
+        (handler_executor, "run", run_handler),
+        (order_ledger, "signal_id", signal_id),
+        (config, "INTAKE_QUEUE", False),
+        (main, "datetime", SimulatedClock),
+        (strategy_engine, "datetime", SimulatedClock),
+        (strategy_engine, "STRATEGIES", strategy_engine.STRATEGIES),
+        (strategy_engine, "_by_slot", strategy_engine._by_slot),
+        (main, "gold_trend", None),
+        (message_parser, "processed_messages", dedupe_cache.DedupeCache(config.DEDUPE_MAX_ENTRIES, float("inf"))),
+    ]
+    for name, value in (overrides or {}).items():
+        patches.append((config, name, _coerce(name, value)))
+
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    strategy_engine.load()
+    try:
+        yield
+    finally:
+        for module, name, value in reversed(saved):
+            setattr(module, name, value)
+
+def _strategy_handler(handler: str) -> Optional[Tuple[str, str]]:
+    for suffix, method in STRATEGY_HANDLERS.items():
+        if handler.endswith("_" + suffix):
+            return handler[:-len(suffix) - 1], method
+    return None
+
+def dispatch(signal: Signal):
+    import main
+
+    if signal.handler in HANDLERS:
+        result = getattr(main, HANDLERS[signal.handler])(**signal.payload)
+    elif signal.handler:
+        name, method = _strategy_handler(signal.handler)
+        result = getattr(strategy_engine.STRATEGIES[name], method)(**signal.payload)
+    else:
+        result = getattr(main, ENDPOINTS[signal.endpoint])(signal.payload)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+def run(
+    signals: List[Signal],
+    prices: Dict[str, PriceSeries],
+    overrides: Optional[Dict[str, Any]] = None,
+    point_values: Optional[Dict[str, float]] = None,
+    quiet: bool = True
+) -> BacktestResult:
+    overrides = {name: _coerce(name, value) for name, value in (overrides or {}).items()}
+    broker = SimulatedBroker(prices, point_values)
+    if quiet:
+        logging.disable(logging.INFO)
+    try:
+        with simulation(broker, overrides):
+            for signal in signals:
+                broker.advance(signal.timestamp)
+                position_tracker.expire_due()
+                dispatch(signal)
+            last_bar = max((float(series.timestamps[-1]) for series in prices.values() if len(series)), default=broker.now)
+            broker.advance(max(last_bar, broker.now))
+    finally:
+        if quiet:
+            logging.disable(logging.NOTSET)
+    return BacktestResult(len(signals), broker.orders, broker.fills, broker.summary(), overrides)
+
+def load_signals(path: str) -> List[Signal]:
+    signals = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            endpoint = record.get("endpoint")
+            handler = record.get("handler")
+            known = handler in HANDLERS or _strategy_handler(handler) is not None if handler else endpoint in ENDPOINTS
+            if not known:
+                raise ValueError(f"{path}:{line_number}: unknown endpoint or handler {endpoint or handler!r}")
+            payload = record.get("args" if handler else "payload") or {}
+            signals.append(Signal(_timestamp(record["timestamp"]), endpoint, payload, handler))
+    signals.sort(key=lambda signal: signal.timestamp)
+    return signals
+
+def load_prices(path: str) -> Dict[str, PriceSeries]:
+    columns: Dict[str, Dict[str, List[float]]] = {}
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            data = columns.setdefault(row["ticker"], {"timestamp": [], "open": [], "high": [], "low": [], "close": []})
+            close = float(row.get("close") or row["price"])
+            data["timestamp"].append(_timestamp(row["timestamp"]))
+            data["close"].append(close)
+            for key in ("open", "high", "low"):
+                data[key].append(float(row.get(key) or close))
+    return {
+        ticker: PriceSeries(*(np.asarray(data[key], dtype=float) for key in ("timestamp", "open", "high", "low", "close")))
+        for ticker, data in columns.items()
+    }
+
+def write_fills(path: str, fills: List[Fill]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["time", "ticker", "side", "quantity", "price", "operation", "closed_quantity", "pnl_points"])
+        writer.writeheader()
+        for fill in fills:
+            writer.writerow(fill.to_dict())
+
+def _parse_assignments(values: List[str]) -> Dict[str, str]:
+    assignments = {}
+    for value in values:
+        name, _, setting = value.partition("=")
+        if not hasattr(config, name):
+            raise SystemExit(f"Unknown config setting: {name}")
+        assignments[name] = setting
+    return assignments
+
+def print_result(result: BacktestResult):
+    label = ", ".join(f"{name}={value}" for name, value in result.overrides.items()) or "baseline"
+    print(f"{label}: {result.signals} signals, {result.orders} orders, {len(result.fills)} fills, total P&L {result.total_pnl():.2f}")
+    for ticker, stats in result.summary.items():
+        print(
+            f"  {ticker:<8} realized {stats['realized_pnl']:>10.2f} ({stats['realized_points']:+.2f} pts)"
+            f"  wins {stats['wins']:>4}  losses {stats['losses']:>4}  max dd {stats['max_drawdown']:>9.2f}"
+            f"  open {stats['open_position']:>3}  unrealized {stats['unrealized_pnl']:>9.2f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded webhook signals through the strategy handlers against a simulated broker")
+    parser.add_argument("--signals", required=True, help="JSONL of {timestamp, endpoint, payload} or {timestamp, handler, args}")
+    parser.add_argument("--prices", required=True, help="CSV with timestamp,ticker and price or open,high,low,close columns")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a config setting for the run")
+    parser.add_argument("--sweep", metavar="NAME=V1,V2,...", help="rerun once per value of a config setting")
+    parser.add_argument("--point-value", action="append", default=[], metavar="TICKER=VALUE")
+    parser.add_argument("--fills", help="write the fills of the (last) run to this CSV")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep handler INFO logging during the replay")
+    args = parser.parse_args()
+
+    signals = load_signals(args.signals)
+    prices = load_prices(args.prices)
+    overrides = _parse_assignments(args.set)
+    point_values = {ticker: float(value) for ticker, _, value in (item.partition("=") for item in args.point_value)}
+
+    runs = [overrides]
+    if args.sweep:
+        name, _, values = args.sweep.partition("=")
+        _parse_assignments([f"{name}="])
+        runs = [{**overrides, name: value} for value in values.split(",")]
+
+    results = [run(signals, prices, run_overrides, point_values, quiet=not args.verbose) for run_overrides in runs]
+    if args.json:
+        json.dump([result.to_dict() for result in results], sys.stdout, indent=2)
+        print()
+    else:
+        for result in results:
+            print_result(result)
+    if args.fills:
+        write_fills(args.fills, results[-1].fills)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import message_parser
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fbd_corpus.json")
+
+def sequential_chain(content: str):
+    target_hit_match = message_parser.parse_target_hit_message(content)
+    if target_hit_match:
+        return message_parser._build_fbd_message(message_parser.TARGET_1_HIT, target_hit_match)
+    target2_hit_match = message_parser.parse_target2_hit_message(content)
+    if target2_hit_match:
+        return message_parser._build_fbd_message(message_parser.TARGET_2_HIT, target2_hit_match)
+    stop_loss_match = message_parser.parse_stop_loss_message(content)
+    if stop_loss_match:
+        return message_parser._build_fbd_message(message_parser.STOP_LOSS_HIT, stop_loss_match)
+    triggered_match = message_parser.parse_long_triggered_message(content)
+    if triggered_match:
+        return message_parser._build_fbd_message(message_parser.LONG_TRIGGERED, triggered_match)
+    return None
+
+def single_pass(content: str):
+    return message_parser.classify_fbd_message(content)
+
+def kind_of(message):
+    return message.kind if message else None
+
+def load_corpus(path: str):
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    corpus = []
+    for entry in entries:
+        corpus.extend([(entry["description"], entry.get("kind"))] * entry.get("weight", 1))
+    return corpus
+
+def bench(func, corpus, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for content, _ in corpus:
+            func(content)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sequential FBD regex chain with the single-pass classifier over a labelled corpus")
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    for content, expected in corpus:
+        for name, func in (("sequential chain", sequential_chain), ("single pass", single_pass)):
+            actual = kind_of(func(content))
+            if expected != actual:
+                raise SystemExit(f"{name} mismatch: expected {expected}, got {actual} for {content!r}")
+
+    messages = len(corpus) * args.rounds
+    for name, func in (("sequential chain", sequential_chain), ("single pass", single_pass)):
+        elapsed = bench(func, corpus, args.rounds)
+        print(f"{name:>16}: {elapsed * 1e9 / messages:8.0f} ns/message ({messages} messages, {elapsed:.3f}s)")
+
+if __name__ == "__main__":
+    main()
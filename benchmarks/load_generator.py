@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import httpx
+import uvicorn
+
+import latency
+from mock_broker import MockBroker
+
+MIX_FILE = os.path.join(BENCH_DIR, "payload_mix.json")
+SIGNAL_EPOCH = datetime(2025, 3, 12, 9, 30)
+REPORT_PERCENTILES = ("p50_ms", "p90_ms", "p99_ms", "p999_ms", "max_ms")
+
+def load_mix(path: str) -> List[Dict]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def render_payload(value: Any, replacements: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for placeholder, replacement in replacements.items():
+            value = value.replace(placeholder, replacement)
+        return value
+    if isinstance(value, dict):
+        return {key: render_payload(item, replacements) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render_payload(item, replacements) for item in value]
+    return value
+
+def build_schedule(mix: List[Dict], count: int, seed: int) -> List[Tuple[str, Dict]]:
+    rng = random.Random(seed)
+    entries = rng.choices(mix, weights=[entry.get("weight", 1) for entry in mix], k=count)
+    schedule = []
+    for sequence, entry in enumerate(entries):
+        replacements = {
+            "{time}": (SIGNAL_EPOCH + timedelta(seconds=sequence)).strftime("%Y-%m-%d %H:%M:%S"),
+            "{seq}": str(sequence),
+        }
+        schedule.append((entry["endpoint"], render_payload(entry["payload"], replacements)))
+    return schedule
+
+def configure_environment(broker_url: str, workdir: str, log_level: str):
+    os.environ["WEBHOOK_URL"] = f"{broker_url}/webhook/mes"
+    os.environ["GOLD_WEBHOOK_URL"] = f"{broker_url}/webhook/gold"
+    os.environ["NQ_WEBHOOK_URL"] = f"{broker_url}/webhook/nq"
+    os.environ["GENERAL_CHANNEL_WEBHOOK_URL"] = f"{broker_url}/webhook/general"
+    os.environ["NTFY_URL"] = f"{broker_url}/ntfy"
+    os.environ["LOG_FILE"] = os.path.join(workdir, "trading_bot.log")
+    os.environ["LOG_LEVEL"] = log_level
+    os.chdir(workdir)
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def start_app(port: int) -> uvicorn.Server:
+    import main as app_module
+
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="bench-app", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise SystemExit("Application did not start within 10s")
+        time.sleep(0.01)
+    return server
+
+async def run_load(base_url: str, schedule: List[Tuple[str, Dict]], rate: float, connections: int):
+    overall = latency.Histogram()
+    by_endpoint: Dict[str, latency.Histogram] = {}
+    statuses: Counter = Counter()
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    timeout = httpx.Timeout(30.0, pool=None)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def fire(endpoint: str, payload: Dict, scheduled_at: float):
+            try:
+                response = await client.post(endpoint, json=payload)
+                outcome = str(response.status_code)
+            except Exception as e:
+                outcome = type(e).__name__
+            elapsed_us = int((time.perf_counter() - scheduled_at) * 1_000_000)
+            overall.record(elapsed_us)
+            histogram = by_endpoint.get(endpoint)
+            if histogram is None:
+                histogram = by_endpoint[endpoint] = latency.Histogram()
+            histogram.record(elapsed_us)
+            statuses[outcome] += 1
+
+        started = time.perf_counter()
+        tasks = []
+        for index, (endpoint, payload) in enumerate(schedule):
+            scheduled_at = started + index / rate
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(endpoint, payload, scheduled_at)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return elapsed, overall, by_endpoint, statuses
+
+def wait_for_drain(broker: MockBroker, timeout: float, quiet_period: float = 0.5):
+    deadline = time.monotonic() + timeout
+    last_count = broker.total_requests()
+    last_change = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        count = broker.total_requests()
+        if count != last_count:
+            last_count = count
+            last_change = time.monotonic()
+        elif time.monotonic() - last_change >= quiet_period:
+            return
+
+def build_report(args, elapsed: float, overall, by_endpoint, statuses, broker: MockBroker) -> Dict:
+    completed = overall.count
+    return {
+        "config": {
+            "rate": args.rate,
+            "duration": args.duration,
+            "connections": args.connections,
+            "broker_latency_ms": args.broker_latency_ms,
+            "broker_jitter_ms": args.broker_jitter_ms,
+            "broker_error_rate": args.broker_error_rate,
+            "seed": args.seed,
+            "mix": os.path.basename(args.mix),
+        },
+        "requests": {
+            "completed": completed,
+            "elapsed_s": elapsed,
+            "throughput_rps": completed / elapsed if elapsed else 0.0,
+            "statuses": dict(statuses),
+        },
+        "latency": overall.summary(),
+        "endpoints": {endpoint: histogram.summary() for endpoint, histogram in sorted(by_endpoint.items())},
+        "stages": latency.snapshot(),
+        "broker": broker.get_stats(),
+    }
+
+def _delta(current: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(current - baseline) / baseline * 100:+.1f}%)"
+
+def print_report(report: Dict, baseline: Optional[Dict] = None):
+    requests = report["requests"]
+    base_requests = baseline["requests"] if baseline else {}
+    print(f"completed:  {requests['completed']} requests in {requests['elapsed_s']:.2f}s")
+    print(f"throughput: {requests['throughput_rps']:.1f} req/s{_delta(requests['throughput_rps'], base_requests.get('throughput_rps'))}")
+    print(f"statuses:   {requests['statuses']}")
+
+    rows = [("all", report["latency"], (baseline or {}).get("latency"))]
+    for endpoint, summary in report["endpoints"].items():
+        rows.append((endpoint, summary, (baseline or {}).get("endpoints", {}).get(endpoint)))
+    for name, summary in report["stages"].items():
+        if ".order." in name or name.endswith(".total"):
+            rows.append((name, summary, (baseline or {}).get("stages", {}).get(name)))
+
+    print()
+    print(f"{'latency (ms)':<32}{'count':>8}" + "".join(f"{column[:-3]:>18}" for column in REPORT_PERCENTILES))
+    for name, summary, base_summary in rows:
+        cells = []
+        for column in REPORT_PERCENTILES:
+            cell = f"{summary[column]:.2f}"
+            if base_summary:
+                cell += _delta(summary[column], base_summary.get(column))
+            cells.append(f"{cell:>18}")
+        print(f"{name:<32}{summary['count']:>8}" + "".join(cells))
+
+    print()
+    print(f"broker requests: {report['broker']['requests']}")
+    if report["broker"]["errors"]:
+        print(f"broker errors:   {report['broker']['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a /gold, /nq and /fbd payload mix against main.app backed by a local mock broker")
+    parser.add_argument("--rate", type=float, default=50.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--mix", default=MIX_FILE)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0, help="application port (0 picks a free one)")
+    parser.add_argument("--broker-latency-ms", type=float, default=20.0)
+    parser.add_argument("--broker-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--broker-error-rate", type=float, default=0.0)
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="seconds to wait for in-flight broker orders after the load ends")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report from an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+    mix = load_mix(args.mix)
+    schedule = build_schedule(mix, max(1, int(args.rate * args.duration)), args.seed)
+
+    broker = MockBroker("127.0.0.1", 0, args.broker_latency_ms, args.broker_jitter_ms, args.broker_error_rate, args.seed).start()
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    configure_environment(broker.url, workdir, args.log_level)
+
+    port = args.port
+    if not port:
+        port = free_port()
+    server = start_app(port)
+    try:
+        elapsed, overall, by_endpoint, statuses = asyncio.run(
+            run_load(f"http://127.0.0.1:{port}", schedule, args.rate, args.connections)
+        )
+        wait_for_drain(broker, args.drain_timeout)
+        report = build_report(args, elapsed, overall, by_endpoint, statuses, broker)
+    finally:
+        server.should_exit = True
+        broker.stop()
+
+    print_report(report, baseline)
+    print(f"\nstate and journal files: {workdir}")
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {output}")
+
+if __name__ == "__main__":
+    main()
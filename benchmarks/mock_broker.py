@@ -0,0 +1,111 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+class MockBroker(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__((host, port), MockBrokerHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_response(self, path: str):
+        with self._lock:
+            self.requests[path] += 1
+            delay = max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors[path] += 1
+        return delay, failed
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+            }
+
+    def start(self) -> "MockBroker":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class MockBrokerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self, with_body: bool):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        delay, failed = self.server.next_response(self.path)
+        if delay:
+            time.sleep(delay)
+        status = 503 if failed else 200
+        body = json.dumps({"status": "error" if failed else "ok"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_POST(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the broker webhook URLs and ntfy")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    broker = MockBroker(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    print(f"Mock broker listening on {broker.url} (latency {args.latency_ms}ms ±{args.jitter_ms}ms, error rate {args.error_rate})")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(broker.get_stats(), indent=2))
+        broker.server_close()
+
+if __name__ == "__main__":
+    main()
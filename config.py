@@ -14,15 +14,81 @@ GOLD_QUANTITY = int(os.getenv("GOLD_QUANTITY", "4"))
 NQ_TICKER = "MNQ"
 NQ_QUANTITY = int(os.getenv("NQ_QUANTITY", "6"))
 
+POINT_VALUES = {
+    TICKER_SYMBOL: 5.0,
+    GOLD_TICKER: 10.0,
+    NQ_TICKER: 2.0,
+}
+
+MIN_SIGNAL_SCORE = int(os.getenv("MIN_SIGNAL_SCORE", "5"))
+MES_STOP_POINTS = float(os.getenv("MES_STOP_POINTS", "3.0"))
+GOLD_STOP_POINTS = float(os.getenv("GOLD_STOP_POINTS", "7.0"))
+GOLD_DEFAULT_TARGET_POINTS = float(os.getenv("GOLD_DEFAULT_TARGET_POINTS", "14.0"))
+NQ_STOP_POINTS = float(os.getenv("NQ_STOP_POINTS", "20"))
+NQ_TAKE_PROFIT_POINTS = float(os.getenv("NQ_TAKE_PROFIT_POINTS", "30"))
+
 WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
 GOLD_WEBHOOK_URL = os.getenv("GOLD_WEBHOOK_URL", "")
 NQ_WEBHOOK_URL = os.getenv("NQ_WEBHOOK_URL", "")
 GENERAL_CHANNEL_WEBHOOK_URL = os.getenv("GENERAL_CHANNEL_WEBHOOK_URL", "")
 
+WEBHOOK_CONNECT_TIMEOUT = float(os.getenv("WEBHOOK_CONNECT_TIMEOUT", "3.0"))
+WEBHOOK_READ_TIMEOUT = float(os.getenv("WEBHOOK_READ_TIMEOUT", "10.0"))
+WEBHOOK_POOL_MAXSIZE = int(os.getenv("WEBHOOK_POOL_MAXSIZE", "10"))
+WEBHOOK_KEEPALIVE_EXPIRY = float(os.getenv("WEBHOOK_KEEPALIVE_EXPIRY", "300.0"))
+WEBHOOK_FANOUT_DEADLINE = float(os.getenv("WEBHOOK_FANOUT_DEADLINE", "8.0"))
+
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+WEBHOOK_BACKOFF_BASE = float(os.getenv("WEBHOOK_BACKOFF_BASE", "0.25"))
+WEBHOOK_BACKOFF_MAX = float(os.getenv("WEBHOOK_BACKOFF_MAX", "2.0"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30.0"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1.0"))
+RETRY_BUDGET_MAX_TOKENS = float(os.getenv("RETRY_BUDGET_MAX_TOKENS", "20"))
+
+NTFY_URL = os.getenv("NTFY_URL", "https://ntfy.sh/fcpauldiaz_notifications")
+NTFY_TIMEOUT = float(os.getenv("NTFY_TIMEOUT", "5.0"))
+NTFY_QUEUE_SIZE = int(os.getenv("NTFY_QUEUE_SIZE", "100"))
+NTFY_COALESCE_WINDOW = float(os.getenv("NTFY_COALESCE_WINDOW", "0.25"))
+
+BRACKET_SUBMISSION = os.getenv("BRACKET_SUBMISSION", "false").lower() == "true"
+BRACKET_DRAIN_TIMEOUT = float(os.getenv("BRACKET_DRAIN_TIMEOUT", "15.0"))
+
+STRATEGY_SPECS_FILE = os.getenv("STRATEGY_SPECS_FILE", "")
+
+BATCH_MAX_SIGNALS = int(os.getenv("BATCH_MAX_SIGNALS", "100"))
+WS_INGEST_WINDOW = int(os.getenv("WS_INGEST_WINDOW", "32"))
+HANDLER_WORKERS = int(os.getenv("HANDLER_WORKERS", "16"))
+HANDLER_MAX_PENDING = int(os.getenv("HANDLER_MAX_PENDING", "1000"))
+
+INTAKE_QUEUE = os.getenv("INTAKE_QUEUE", "false").lower() == "true"
+INTAKE_QUEUE_FILE = os.getenv("INTAKE_QUEUE_FILE", "intake_queue.jsonl")
+
+LEDGER_FILE = os.getenv("LEDGER_FILE", "order_ledger.jsonl")
+LEDGER_RETENTION = float(os.getenv("LEDGER_RETENTION", "86400"))
+LEDGER_DEDUPE_WINDOW = float(os.getenv("LEDGER_DEDUPE_WINDOW", "300"))
+IDEMPOTENCY_HEADER = os.getenv("IDEMPOTENCY_HEADER", "Idempotency-Key")
+
 ORDER_FILE = "open_order.json"
 GOLD_ORDER_FILE = "open_gold_order.json"
 NQ_ORDER_FILE = "open_nq_order.json"
 
+CSV_FLUSH_ROWS = int(os.getenv("CSV_FLUSH_ROWS", "50"))
+CSV_FLUSH_INTERVAL = float(os.getenv("CSV_FLUSH_INTERVAL", "1.0"))
+CSV_ROTATE = os.getenv("CSV_ROTATE", "daily").lower()
+CSV_MAX_BYTES = int(os.getenv("CSV_MAX_BYTES", str(10 * 1024 * 1024)))
+
+DEDUPE_MAX_ENTRIES = int(os.getenv("DEDUPE_MAX_ENTRIES", "10000"))
+DEDUPE_TTL = float(os.getenv("DEDUPE_TTL", "86400"))
+DEDUPE_CACHE_FILE = os.getenv("DEDUPE_CACHE_FILE", "processed_messages.json")
+
+ORDER_EXPIRY_SECONDS = float(os.getenv("ORDER_EXPIRY_SECONDS", "3600"))
+ORDER_EXPIRY_ACTION = os.getenv("ORDER_EXPIRY_ACTION", "none").lower()
+
+STATE_FSYNC = os.getenv("STATE_FSYNC", "true").lower() == "true"
+STATE_FSYNC_WINDOW = float(os.getenv("STATE_FSYNC_WINDOW", "0.005"))
+
 LONG_TRIGGERED_PATTERN = re.compile(
     r"Ticker: \*\*([^*]+)\*\*\s*\nInterval: \*\*(\d+)\*\*\s*\nLevel: \*\*([\d.]+)\*\*\s*\nScore: \*\*(\d+/\d+)\*\*\s*\nPrice: \*\*([\d.]+)\*\*\s*\nTime: \*\*([\d\s:-]+)\*\*",
     re.IGNORECASE | re.MULTILINE
@@ -50,3 +116,7 @@ STOP_LOSS_SIMPLE_PATTERN = re.compile(
 
 TRADING_MODE = os.getenv("TRADING_MODE", "paper")
 
+LOG_FILE = os.getenv("LOG_FILE", "trading_bot.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
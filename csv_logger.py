@@ -1,30 +1,144 @@
 import logging
 import csv
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Optional
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import List, Optional, TextIO
+
+import config
 
 logger = logging.getLogger(__name__)
 
 CSV_LOG_FILE = "trades.csv"
+CSV_HEADER = [
+    'timestamp', 'ticker', 'action', 'quantity', 'price',
+    'order_type', 'source', 'result'
+]
+
+class TradeJournalWriter:
+    def __init__(self, path: str, flush_rows: int, flush_interval: float, rotate: str, max_bytes: int):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rotate = rotate
+        self.max_bytes = max_bytes
+        self._rows: List[list] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._file: Optional[TextIO] = None
+        self._writer = None
+        self._opened_on: Optional[str] = None
+        self._flushing = False
+        self._stopping = False
+
+    def append(self, row: list):
+        with self._cond:
+            self._rows.append(row)
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping = False
+                self._worker = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+                self._worker.start()
+            if len(self._rows) >= self.flush_rows:
+                self._cond.notify_all()
+
+    def _open(self):
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        opened_at = datetime.now() if is_new else datetime.fromtimestamp(os.path.getmtime(self.path))
+        self._opened_on = opened_at.strftime("%Y-%m-%d")
+        self._file = open(self.path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(CSV_HEADER)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+    def _rotated_path(self, day: str) -> str:
+        base, ext = os.path.splitext(self.path)
+        candidate = f"{base}.{day}{ext}"
+        index = 1
+        while os.path.exists(candidate):
+            candidate = f"{base}.{day}.{index}{ext}"
+            index += 1
+        return candidate
 
-def ensure_csv_header():
-    if not os.path.exists(CSV_LOG_FILE):
-        with open(CSV_LOG_FILE, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'timestamp', 'ticker', 'action', 'quantity', 'price', 
-                'order_type', 'source', 'result'
-            ])
+    def _maybe_rotate(self):
+        if self.rotate == "none" or self._file is None:
+            return
+        today = datetime.now().strftime("%Y-%m-%d")
+        due = False
+        if self.rotate == "daily" and self._opened_on != today:
+            due = True
+        elif self.rotate == "size" and self._file.tell() >= self.max_bytes:
+            due = True
+        if not due:
+            return
+        self._close()
+        rotated = self._rotated_path(self._opened_on or today)
+        os.replace(self.path, rotated)
+        logger.info("Trade journal rotated to %s", rotated)
+
+    def _write_batch(self, rows: List[list]):
+        if self._file is None:
+            self._open()
+        self._maybe_rotate()
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+        logger.debug("Trade journal wrote %s row(s)", len(rows))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._rows) < self.flush_rows and not self._stopping and not self._flushing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                rows = self._rows
+                self._rows = []
+                stopping = self._stopping
+            if rows:
+                try:
+                    self._write_batch(rows)
+                except Exception as e:
+                    logger.error("Error writing trade journal: %s", e)
+            with self._cond:
+                self._flushing = False
+                self._cond.notify_all()
+                if stopping and not self._rows:
+                    self._close()
+                    return
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                return not self._rows
+            self._flushing = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._rows and not self._flushing, timeout)
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+journal = TradeJournalWriter(
+    CSV_LOG_FILE,
+    config.CSV_FLUSH_ROWS,
+    config.CSV_FLUSH_INTERVAL,
+    config.CSV_ROTATE,
+    config.CSV_MAX_BYTES,
+)
 
 def log_trade(
     ticker: str,
@@ -35,20 +149,19 @@ def log_trade(
     source: Optional[str] = None,
     result: Optional[str] = None
 ):
-    ensure_csv_header()
-    
-    with open(CSV_LOG_FILE, 'a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            datetime.now().isoformat(),
-            ticker,
-            action,
-            quantity,
-            price or '',
-            order_type or '',
-            source or '',
-            result or ''
-        ])
-    
-    logger.info(f"Trade logged: {ticker} {action} {quantity} @ {price}")
+    journal.append([
+        datetime.now().isoformat(),
+        ticker,
+        action,
+        quantity,
+        price or '',
+        order_type or '',
+        source or '',
+        result or ''
+    ])
+
+def flush(timeout: float = 5.0) -> bool:
+    return journal.flush(timeout)
 
+def shutdown(timeout: float = 5.0):
+    journal.shutdown(timeout)
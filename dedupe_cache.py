@@ -0,0 +1,139 @@
+import logging
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import state_store
+
+logger = logging.getLogger(__name__)
+
+def hash_key(content: str) -> int:
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "little")
+
+class DedupeCache:
+    def __init__(self, max_entries: int, ttl: float, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._journal = None
+        self._journaled = 0
+
+    def _journal_path(self) -> str:
+        return f"{self.path}.journal"
+
+    def _load(self):
+        self._loaded = True
+        if not self.path:
+            return
+        entries = []
+        try:
+            data = state_store.read(self.path)
+            if data:
+                entries.extend(data.get("entries", []))
+        except Exception as e:
+            logger.warning("Could not load dedupe cache from %s: %s", self.path, e)
+        journal_path = self._journal_path()
+        if os.path.exists(journal_path):
+            try:
+                with open(journal_path, 'r') as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 2:
+                            entries.append((parts[0], float(parts[1])))
+            except Exception as e:
+                logger.warning("Could not read dedupe journal %s: %s", journal_path, e)
+        now = time.time()
+        for key, expires_at in sorted(entries, key=lambda entry: entry[1]):
+            if expires_at > now:
+                self._entries.pop(int(key), None)
+                self._entries[int(key)] = expires_at
+        self._evict(now)
+        self._compact()
+
+    def _evict(self, now: float):
+        while self._entries:
+            key, expires_at = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            self.evictions += 1
+
+    def _compact(self):
+        if not self.path:
+            return
+        state_store.write(self.path, {"entries": list(self._entries.items())})
+        state_store.flush()
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self._journal_path(), 'w')
+        self._journaled = 0
+
+    def _append(self, key: int, expires_at: float):
+        if not self.path:
+            return
+        if self._journaled >= self.max_entries:
+            self._compact()
+        if self._journal is None:
+            self._journal = open(self._journal_path(), 'a')
+        self._journal.write(f"{key} {expires_at!r}\n")
+        self._journal.flush()
+        self._journaled += 1
+
+    def load(self):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+    def __contains__(self, key: int) -> bool:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            expires_at = self._entries.get(key)
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.evictions += 1
+                expires_at = None
+            if expires_at is None:
+                self.misses += 1
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, key: int):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            now = time.time()
+            self._entries.pop(key, None)
+            self._entries[key] = now + self.ttl
+            self._evict(now)
+            try:
+                self._append(key, now + self.ttl)
+            except Exception as e:
+                logger.error("Error persisting dedupe key: %s", e)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._compact()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,126 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+import metrics
+
+metrics.describe("handler_executor_queue_wait_seconds", "histogram", "Time signal work waited for a handler executor thread")
+metrics.describe("handler_executor_run_seconds", "histogram", "Time signal work ran on a handler executor thread")
+metrics.describe("handler_executor_rejected_total", "counter", "Signal work rejected because the handler executor backlog was full")
+
+_executors: List["BoundedExecutor"] = []
+
+class ExecutorSaturatedError(Exception):
+    pass
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self.labels = metrics.labels(executor=name)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        _executors.append(self)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+                executor = self._executor
+        return executor
+
+    def _admit(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                metrics.inc("handler_executor_rejected_total", self.labels)
+                raise ExecutorSaturatedError(f"{self.pending} signal(s) already waiting for a handler thread")
+            self.pending += 1
+
+    def _release(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        self._admit()
+        context = contextvars.copy_context()
+        queued_at = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            metrics.observe("handler_executor_queue_wait_seconds", self.labels, started - queued_at)
+            with self._lock:
+                self.active += 1
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                metrics.observe("handler_executor_run_seconds", self.labels, time.perf_counter() - started)
+
+        try:
+            future = self._get_executor().submit(call)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self.active,
+                "queued": self.pending - self.active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+executor = BoundedExecutor("signal-handler", config.HANDLER_WORKERS, config.HANDLER_MAX_PENDING)
+
+async def run(func: Callable, *args: Any) -> Any:
+    return await executor.run(func, *args)
+
+def shutdown(wait: bool = True):
+    executor.shutdown(wait)
+
+def _collect_metrics():
+    stats = [(executor.labels, executor.get_stats()) for executor in list(_executors)]
+    yield "handler_executor_workers", "gauge", "Handler executor thread limit", [
+        ("handler_executor_workers", labels, values["workers"]) for labels, values in stats
+    ]
+    yield "handler_executor_active", "gauge", "Handler executor threads currently running signal work", [
+        ("handler_executor_active", labels, values["active"]) for labels, values in stats
+    ]
+    yield "handler_executor_queued", "gauge", "Signal work waiting for a handler executor thread", [
+        ("handler_executor_queued", labels, values["queued"]) for labels, values in stats
+    ]
+    yield "handler_executor_completed_total", "counter", "Signal work finished by the handler executor", [
+        ("handler_executor_completed_total", labels, values["completed"]) for labels, values in stats
+    ]
+
+metrics.register_collector(_collect_metrics)
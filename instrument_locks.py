@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+
+class InstrumentLock:
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._owner: Optional[Any] = None
+        self._depth = 0
+        self._waiters: deque = deque()
+
+    def _try_acquire(self, owner: Any) -> bool:
+        if self._owner is None or self._owner is owner:
+            self._owner = owner
+            self._depth += 1
+            return True
+        return False
+
+    def _wake_next(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                return
+            loop, future = waiter
+            if not future.done():
+                loop.call_soon_threadsafe(_resolve, future)
+                return
+
+    def acquire(self, owner: Any) -> bool:
+        contended = False
+        while True:
+            with self._mutex:
+                if self._try_acquire(owner):
+                    return contended
+                waiter = threading.Event()
+                self._waiters.append(waiter)
+            contended = True
+            waiter.wait()
+
+    async def acquire_async(self, owner: Any) -> bool:
+        contended = False
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._mutex:
+                if self._try_acquire(owner):
+                    return contended
+                future = loop.create_future()
+                waiter = (loop, future)
+                self._waiters.append(waiter)
+            contended = True
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._mutex:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif self._owner is None:
+                        self._wake_next()
+                raise
+
+    def release(self):
+        with self._mutex:
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._wake_next()
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+def _thread_owner() -> Any:
+    return threading.current_thread()
+
+_locks: Dict[str, InstrumentLock] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_registry_lock = threading.Lock()
+
+def _get(instrument: str) -> InstrumentLock:
+    lock = _locks.get(instrument)
+    if lock is None:
+        with _registry_lock:
+            lock = _locks.get(instrument)
+            if lock is None:
+                lock = InstrumentLock()
+                _stats[instrument] = {
+                    "acquisitions": 0,
+                    "contended": 0,
+                    "total_wait_ms": 0.0,
+                    "max_wait_ms": 0.0,
+                }
+                _locks[instrument] = lock
+    return lock
+
+def _record(instrument: str, started: float, contended: bool):
+    wait_ms = (time.perf_counter() - started) * 1000
+    stats = _stats[instrument]
+    stats["acquisitions"] += 1
+    stats["total_wait_ms"] += wait_ms
+    if contended:
+        stats["contended"] += 1
+    if wait_ms > stats["max_wait_ms"]:
+        stats["max_wait_ms"] = wait_ms
+
+@contextmanager
+def hold(instrument: str):
+    lock = _get(instrument)
+    started = time.perf_counter()
+    _record(instrument, started, lock.acquire(_thread_owner()))
+    try:
+        yield
+    finally:
+        lock.release()
+
+@asynccontextmanager
+async def hold_async(instrument: str):
+    lock = _get(instrument)
+    started = time.perf_counter()
+    _record(instrument, started, await lock.acquire_async(asyncio.current_task()))
+    try:
+        yield
+    finally:
+        lock.release()
+
+def serialized(instrument: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with hold_async(instrument):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with hold(instrument):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    with _registry_lock:
+        result = {}
+        for instrument, stats in _stats.items():
+            acquisitions = stats["acquisitions"]
+            result[instrument] = {
+                **stats,
+                "avg_wait_ms": stats["total_wait_ms"] / acquisitions if acquisitions else 0.0,
+            }
+        return result
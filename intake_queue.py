@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import config
+import handler_executor
+import metrics
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_WORKERS = 4
+COMPACT_RECORDS = 1000
+RESULTS_KEPT = 1000
+
+metrics.describe("intake_accepted_total", "counter", "Signals journaled and acknowledged with 202, by lane")
+metrics.describe("intake_executed_total", "counter", "Queued signals executed by lane workers, by lane and status")
+metrics.describe("intake_replayed_total", "counter", "Unfinished signals re-queued from the intake journal at startup")
+metrics.describe("intake_queue_wait_seconds", "histogram", "Time a queued signal waited between acknowledgement and execution, by lane")
+metrics.describe("intake_journal_fsync_seconds", "histogram", "Intake journal fsync latency")
+
+journal_executor = handler_executor.BoundedExecutor("intake-journal", JOURNAL_WORKERS, config.HANDLER_MAX_PENDING)
+
+_file = None
+_write_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_written = 0
+_synced = 0
+_records = 0
+
+_cond = threading.Condition()
+_lanes: Dict[str, deque] = {}
+_workers: Dict[str, threading.Thread] = {}
+_pending: Dict[str, Dict[str, Any]] = {}
+_staged: deque = deque()
+_running: Dict[str, str] = {}
+_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_execute: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None
+_stopping = False
+
+def _fsync_dir(path: str):
+    if not config.STATE_FSYNC or not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _read_journal(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    outstanding: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+                op = record.pop("op")
+                if op == "accept":
+                    outstanding[record["id"]] = record
+                elif op == "done":
+                    outstanding.pop(record["id"], None)
+            except Exception as e:
+                logger.warning("Skipping unreadable intake journal line %s in %s: %s", number, path, e)
+    return list(outstanding.values())
+
+def _rewrite_journal(path: str, entries: List[Dict[str, Any]]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for entry in entries:
+            f.write(json.dumps({"op": "accept", **entry}, separators=(",", ":")) + "\n")
+        f.flush()
+        if config.STATE_FSYNC:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+def _write(record: Dict[str, Any]) -> int:
+    global _written, _records
+    _file.write(json.dumps(record, separators=(",", ":")) + "\n")
+    _file.flush()
+    _written += 1
+    _records += 1
+    return _written
+
+def _sync(sequence: int):
+    global _synced
+    if not config.STATE_FSYNC:
+        return
+    with _sync_lock:
+        if _synced >= sequence:
+            return
+        with _write_lock:
+            target = _written
+            fd = _file.fileno()
+        started = time.perf_counter()
+        os.fsync(fd)
+        metrics.observe("intake_journal_fsync_seconds", (), time.perf_counter() - started)
+        _synced = target
+
+def _compactable() -> bool:
+    return _records - len(_pending) >= COMPACT_RECORDS
+
+def _compact():
+    global _file, _records, _synced
+    with _sync_lock, _write_lock:
+        if _file is None or not _compactable():
+            return
+        _file.close()
+        _rewrite_journal(config.INTAKE_QUEUE_FILE, list(_pending.values()))
+        _file = open(config.INTAKE_QUEUE_FILE, 'a')
+        _records = len(_pending)
+        _synced = _written
+        outstanding = _records
+    logger.debug("Compacted intake journal %s to %s outstanding signal(s)", config.INTAKE_QUEUE_FILE, outstanding)
+
+def _enqueue(entry: Dict[str, Any]):
+    lane = entry["lane"]
+    with _cond:
+        queue = _lanes.get(lane)
+        if queue is None:
+            queue = _lanes[lane] = deque()
+        queue.append(entry)
+        worker = _workers.get(lane)
+        if worker is None or not worker.is_alive():
+            worker = threading.Thread(target=_run_lane, args=(lane,), name=f"intake-{lane}", daemon=True)
+            _workers[lane] = worker
+            worker.start()
+        _cond.notify_all()
+
+def _release(sequence: int):
+    with _cond:
+        while _staged and _staged[0][0] <= sequence:
+            _enqueue(_staged.popleft()[1])
+
+def accept(lane: str, strategy: str, item: Dict[str, Any], timestamp: str, scope: Optional[str] = None) -> str:
+    if _file is None:
+        raise RuntimeError("Intake queue is not running")
+    entry = {
+        "id": uuid.uuid4().hex,
+        "lane": lane,
+        "strategy": strategy,
+        "item": item,
+        "timestamp": timestamp,
+        "accepted_at": time.time(),
+        "scope": scope,
+    }
+    with _write_lock:
+        sequence = _write({"op": "accept", **entry})
+        _pending[entry["id"]] = entry
+        _staged.append((sequence, entry))
+    _sync(sequence)
+    _release(sequence)
+    metrics.inc("intake_accepted_total", metrics.labels(lane=lane))
+    return entry["id"]
+
+def _finish(entry: Dict[str, Any], result: Dict[str, Any]):
+    status = result.get("status", "unknown") if isinstance(result, dict) else "unknown"
+    with _write_lock:
+        try:
+            _write({"op": "done", "id": entry["id"], "status": status})
+        except Exception as e:
+            logger.error("Error recording intake %s as done: %s", entry["id"], e)
+        _pending.pop(entry["id"], None)
+        _results[entry["id"]] = {"strategy": entry["strategy"], "result": result}
+        while len(_results) > RESULTS_KEPT:
+            _results.popitem(last=False)
+    metrics.inc("intake_executed_total", metrics.labels(lane=entry["lane"], status=status))
+    if _compactable():
+        try:
+            _compact()
+        except Exception as e:
+            logger.error("Error compacting intake journal: %s", e)
+
+def _run_lane(lane: str):
+    loop = asyncio.new_event_loop()
+    try:
+        _drain_lane(lane, loop)
+    finally:
+        loop.close()
+
+def _drain_lane(lane: str, loop: asyncio.AbstractEventLoop):
+    queue = _lanes[lane]
+    labels = metrics.labels(lane=lane)
+    while True:
+        with _cond:
+            while not queue and not _stopping:
+                _cond.wait()
+            if _stopping:
+                return
+            entry = queue.popleft()
+            _running[lane] = entry["id"]
+
+        metrics.observe("intake_queue_wait_seconds", labels, max(0.0, time.time() - entry["accepted_at"]))
+        try:
+            result = loop.run_until_complete(_execute(entry))
+        except Exception as e:
+            logger.error("Error executing queued %s signal %s: %s", entry["strategy"], entry["id"], e)
+            result = {"status": "error", "message": f"Error processing webhook: {str(e)}", "timestamp": entry["timestamp"]}
+        _finish(entry, result)
+        with _cond:
+            _running.pop(lane, None)
+            _cond.notify_all()
+
+def start(execute: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+    global _file, _execute, _stopping
+    if _file is not None:
+        return
+    _execute = execute
+    _stopping = False
+    path = config.INTAKE_QUEUE_FILE
+    entries = _read_journal(path)
+    _rewrite_journal(path, entries)
+    with _write_lock:
+        _file = open(path, 'a')
+        for entry in entries:
+            _pending[entry["id"]] = entry
+            _enqueue(entry)
+    if entries:
+        metrics.inc("intake_replayed_total", (), len(entries))
+        logger.warning("Re-queued %s unfinished signal(s) from intake journal %s", len(entries), path)
+    logger.info("Intake queue started with journal %s", path)
+
+def stop(timeout: float = 10.0):
+    global _file, _stopping
+    if _file is None:
+        return
+    with _cond:
+        _stopping = True
+        _cond.notify_all()
+        workers = list(_workers.values())
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+    with _sync_lock, _write_lock:
+        try:
+            if config.STATE_FSYNC:
+                os.fsync(_file.fileno())
+        finally:
+            _file.close()
+            _file = None
+    with _cond:
+        _lanes.clear()
+        _workers.clear()
+        _running.clear()
+        _pending.clear()
+        _staged.clear()
+    journal_executor.shutdown()
+
+def status(intake_id: str) -> Optional[Dict[str, Any]]:
+    with _write_lock, _cond:
+        entry = _pending.get(intake_id)
+        done = _results.get(intake_id)
+        running = entry is not None and _running.get(entry["lane"]) == intake_id
+    if entry is not None:
+        state = "running" if running else "queued"
+        return {"intake_id": intake_id, "state": state, "strategy": entry["strategy"], "timestamp": entry["timestamp"]}
+    if done is not None:
+        return {"intake_id": intake_id, "state": "done", **done}
+    return None
+
+def _collect_metrics():
+    with _cond:
+        depths = [(lane, len(queue) + (1 if lane in _running else 0)) for lane, queue in _lanes.items()]
+    yield "intake_queue_depth", "gauge", "Acknowledged signals not yet executed, by lane", [
+        ("intake_queue_depth", metrics.labels(lane=lane), depth) for lane, depth in depths
+    ]
+
+metrics.register_collector(_collect_metrics)
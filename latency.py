@@ -0,0 +1,168 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+MAX_SHIFT = 30
+BUCKET_COUNT = SUB_BUCKET_COUNT + MAX_SHIFT * SUB_BUCKET_HALF
+
+TRACED_PATHS = {"/gold", "/nq", "/fbd", "/gold-trend", "/batch"}
+TRACED_PREFIXES = {"/strategies/": "strategies"}
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKET_COUNT:
+            return value
+        shift = min(value.bit_length() - SUB_BUCKET_BITS, MAX_SHIFT)
+        sub = min(value >> shift, SUB_BUCKET_COUNT - 1)
+        return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (sub - SUB_BUCKET_HALF)
+
+    @staticmethod
+    def _highest_equivalent(index: int) -> int:
+        if index < SUB_BUCKET_COUNT:
+            return index
+        offset = index - SUB_BUCKET_COUNT
+        shift = offset // SUB_BUCKET_HALF + 1
+        sub = offset % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_us: int):
+        if value_us < 0:
+            value_us = 0
+        index = self._index(value_us)
+        with self._lock:
+            self.counts[index] += 1
+            if self.count == 0 or value_us < self.min:
+                self.min = value_us
+            if value_us > self.max:
+                self.max = value_us
+            self.count += 1
+            self.total += value_us
+
+    def percentile(self, percentile: float) -> int:
+        with self._lock:
+            if self.count == 0:
+                return 0
+            target = max(1, int(self.count * percentile / 100.0 + 0.5))
+            seen = 0
+            for index, bucket in enumerate(self.counts):
+                seen += bucket
+                if seen >= target:
+                    return min(self._highest_equivalent(index), self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        count = self.count
+        return {
+            "count": count,
+            "min_ms": self.min / 1000,
+            "mean_ms": (self.total / count / 1000) if count else 0.0,
+            "p50_ms": self.percentile(50) / 1000,
+            "p90_ms": self.percentile(90) / 1000,
+            "p99_ms": self.percentile(99) / 1000,
+            "p999_ms": self.percentile(99.9) / 1000,
+            "max_ms": self.max / 1000,
+        }
+
+class Trace:
+    __slots__ = ("endpoint", "started", "last_mark")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.last_mark = self.started
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+_current: ContextVar[Optional[Trace]] = ContextVar("latency_trace", default=None)
+
+def get_histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = Histogram()
+                _histograms[name] = histogram
+    return histogram
+
+def record(name: str, seconds: float):
+    get_histogram(name).record(int(seconds * 1_000_000))
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def set_trace(trace: Optional[Trace]):
+    _current.set(trace)
+
+def start(endpoint: str) -> Trace:
+    trace = Trace(endpoint)
+    _current.set(trace)
+    return trace
+
+def mark(stage: str):
+    trace = _current.get()
+    if trace is None:
+        return
+    now = time.perf_counter()
+    record(f"{trace.endpoint}.{stage}", now - trace.last_mark)
+    trace.last_mark = now
+
+def record_stage(stage: str, seconds: float):
+    trace = _current.get()
+    if trace is not None:
+        record(f"{trace.endpoint}.{stage}", seconds)
+
+def record_leg(leg: str, seconds: float):
+    record(f"order.{leg}", seconds)
+    trace = _current.get()
+    if trace is not None:
+        record(f"{trace.endpoint}.order.{leg}", seconds)
+        record(f"{trace.endpoint}.signal_to_ack.{leg}", time.perf_counter() - trace.started)
+
+def finish(trace: Trace):
+    record(f"{trace.endpoint}.total", time.perf_counter() - trace.started)
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    with _histograms_lock:
+        names = sorted(_histograms)
+    return {name: _histograms[name].summary() for name in names}
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+def _endpoint_for(path: str) -> Optional[str]:
+    if path in TRACED_PATHS:
+        return path.lstrip("/")
+    for prefix, endpoint in TRACED_PREFIXES.items():
+        if path.startswith(prefix):
+            return endpoint
+    return None
+
+class LatencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        endpoint = _endpoint_for(scope["path"]) if scope["type"] == "http" else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+        trace = start(endpoint)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finish(trace)
@@ -0,0 +1,78 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from typing import Any, Optional
+
+import config
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["DeferredQueueHandler"] = None
+
+class LazyJson:
+    __slots__ = ("value", "indent")
+
+    def __init__(self, value: Any, indent: Optional[int] = 2):
+        self.value = value
+        self.indent = indent
+
+    def __str__(self) -> str:
+        try:
+            return json.dumps(self.value, indent=self.indent, default=str)
+        except Exception:
+            return repr(self.value)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def configure():
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(config.LOG_FILE)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(config.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _handler = DeferredQueueHandler(log_queue)
+    root.addHandler(_handler)
+    root.setLevel(config.LOG_LEVEL)
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+def shutdown():
+    global _listener
+    if _listener is None:
+        return
+    listener = _listener
+    _listener = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+def get_dropped() -> int:
+    return _handler.dropped if _handler is not None else 0
@@ -1,16 +1,80 @@
+import asyncio
+import functools
 import json
+import logging
 from datetime import datetime
-from typing import Optional
-from fastapi import FastAPI
+from typing import Dict, List, Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 import uvicorn
 
 import config
+import csv_logger
+import handler_executor
+import intake_queue
+import instrument_locks
+import latency
+import log_pipeline
 import message_parser
+import metrics
+import notifier
 import order_executor
+import order_ledger
+import order_templates
 import position_tracker
+import state_store
+import strategy_engine
+
+log_pipeline.configure()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
+app.add_middleware(latency.LatencyMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+strategy_engine.load()
+
+def handle_position_expired(slot: str, order_data: Dict):
+    if config.ORDER_EXPIRY_ACTION not in ("cancel", "exit"):
+        return
+    strategy = strategy_engine.for_slot(slot)
+    if strategy is not None:
+        ticker, url, exit_template = strategy.ticker, strategy.url, strategy.exit_order
+    elif slot == position_tracker.MES:
+        ticker, url, exit_template = config.TICKER_SYMBOL, config.WEBHOOK_URL, order_templates.MES_EXIT
+    else:
+        return
+    with order_ledger.scope(order_ledger.signal_id(f"expiry:{slot}", order_data)):
+        if config.ORDER_EXPIRY_ACTION == "cancel":
+            order_executor.send_cancel_webhook(ticker, url)
+        else:
+            order_executor.send_webhook_to_multiple_urls(exit_template.render(), [url], f"{ticker} expiry exit webhook")
+    logger.info("Sent %s for expired %s position", config.ORDER_EXPIRY_ACTION, ticker)
+
+position_tracker.on_expire(handle_position_expired)
+
+@app.on_event("startup")
+def startup():
+    position_tracker.load()
+    order_ledger.load()
+    message_parser.processed_messages.load()
+    position_tracker.start_expiry()
+    order_executor.warm_up([config.WEBHOOK_URL] + [strategy.url for strategy in strategy_engine.STRATEGIES.values()])
+    if config.INTAKE_QUEUE:
+        intake_queue.start(execute_intake)
+
+@app.on_event("shutdown")
+def shutdown():
+    intake_queue.stop()
+    handler_executor.shutdown()
+    position_tracker.stop_expiry()
+    order_executor.shutdown()
+    order_ledger.close()
+    notifier.shutdown()
+    csv_logger.shutdown()
+    position_tracker.flush()
+    log_pipeline.shutdown()
 
 gold_trend: Optional[str] = None
 
@@ -30,21 +94,22 @@ class OrderPayload(BaseModel):
     takeProfit: Optional[TakeProfit]
     stopLoss: Optional[StopLoss]
 
-def handle_trim_message(trim_match):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_trim_message(trim_match):
     if not position_tracker.has_open_order():
-        print("No open order to trim")
+        logger.info("No open order to trim")
         return
     
     order_info = position_tracker.get_open_order_info()
     if not order_info:
-        print("Could not retrieve order info")
+        logger.warning("Could not retrieve order info")
         return
     
     numerator = int(trim_match.group(1))
     denominator = int(trim_match.group(2))
     trim_percentage = numerator / denominator
     
-    print(f"Trim message: {numerator}/{denominator} = {trim_percentage:.2%}")
+    logger.info("Trim message: %s/%s = %s", numerator, denominator, format(trim_percentage, '.2%'))
     
     original_action = order_info["order_info"]["action"]
     original_quantities = order_info["order_info"]["quantities"]
@@ -55,29 +120,24 @@ def handle_trim_message(trim_match):
     personal_close_qty = int(original_quantities["personal"] * trim_percentage)
     webhook_close_qty = int(original_quantities["webhook"] * trim_percentage)
     
-    print(f"Closing quantities: Personal={personal_close_qty}, Webhook={webhook_close_qty}")
+    logger.info("Closing quantities: Personal=%s, Webhook=%s", personal_close_qty, webhook_close_qty)
     
     try:
         if personal_close_qty >= 1:
-            print(f"Would submit personal close order: qty={personal_close_qty}, is_buy={close_is_buy}")
+            logger.info("Would submit personal close order: qty=%s, is_buy=%s", personal_close_qty, close_is_buy)
         else:
-            print(f"Skipping personal close order - quantity is {personal_close_qty} (must be >= 1)")
+            logger.info("Skipping personal close order - quantity is %s (must be >= 1)", personal_close_qty)
         
         if webhook_close_qty >= 1:
-            webhook_payload = {
-                "ticker": config.TICKER_SYMBOL,
-                "price": "",
-                "action": "sell",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_MARKET["sell"].render(price="")
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Close webhook")
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Close webhook")
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_close_qty} (must be >= 1)")
+            logger.info("Skipping webhook submission - quantity is %s (must be >= 1)", webhook_close_qty)
         
         if trim_percentage >= 1.0:
             position_tracker.clear_open_order()
-            print("Order fully closed and cleared")
+            logger.info("Order fully closed and cleared")
         else:
             remaining_quantities = {
                 "personal": original_quantities["personal"] - personal_close_qty,
@@ -86,61 +146,52 @@ def handle_trim_message(trim_match):
             
             order_info["order_info"]["quantities"] = remaining_quantities
             position_tracker.save_open_order(order_info["order_info"])
-            print(f"Order updated with remaining quantities: {remaining_quantities}")
+            logger.info("Order updated with remaining quantities: %s", remaining_quantities)
             
             if numerator == 1 and denominator == 8:
                 entry_price = order_info["order_info"].get("price")
                 remaining_webhook_qty = remaining_quantities.get("webhook", 0)
                 if entry_price is None:
-                    print("Cannot place stop after 1/8 trim - original entry price not available")
+                    logger.info("Cannot place stop after 1/8 trim - original entry price not available")
                 elif remaining_webhook_qty < 1:
-                    print(f"Skipping stop order submission after 1/8 trim - quantity is {remaining_webhook_qty} (must be >= 1)")
+                    logger.info("Skipping stop order submission after 1/8 trim - quantity is %s (must be >= 1)", remaining_webhook_qty)
                 else:
-                    stop_price = float(entry_price) - 3.0
-                    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-                    stop_webhook_payload = {
-                        "ticker": config.TICKER_SYMBOL,
-                        "action": "sell",
-                        "time": current_time,
-                        "orderType": "stop",
-                        "stopPrice": str(stop_price),
-                        "quantityType": "fixed_quantity"
-                    }
-                    order_executor.send_webhook(stop_webhook_payload, config.WEBHOOK_URL, remaining_webhook_qty, "1/8 trim stop order webhook")
-                    print(f"Stop order placed after 1/8 trim at {stop_price} (3 points below entry {entry_price}) for {remaining_webhook_qty} contract(s)")
+                    stop_price = float(entry_price) - config.MES_STOP_POINTS
+                    current_time = datetime.now().isoformat(" ", "microseconds")
+                    stop_webhook_payload = order_templates.MES_STOP["sell"].render(time=current_time, stopPrice=str(stop_price))
+                    await order_executor.send_webhook_async(stop_webhook_payload, config.WEBHOOK_URL, remaining_webhook_qty, "1/8 trim stop order webhook")
+                    logger.info("Stop order placed after 1/8 trim at %s (%s points below entry %s) for %s contract(s)", stop_price, config.MES_STOP_POINTS, entry_price, remaining_webhook_qty)
             
     except Exception as e:
-        print(f"Error submitting close orders: {e}")
+        logger.error("Error submitting close orders: %s", e)
 
-def handle_stopped_message():
-    print("Stopped message received - calling flat and cancel methods")
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_stopped_message():
+    logger.info("Stopped message received - calling flat and cancel methods")
     
     try:
-        print("Would call flatten_and_cancel methods")
+        logger.info("Would call flatten_and_cancel methods")
         
         if position_tracker.has_open_order():
             position_tracker.clear_open_order()
-            print("Open order cleared")
+            logger.info("Open order cleared")
         
-        webhook_payload = {
-            "ticker": config.TICKER_SYMBOL,
-            "action": "exit",
-            "orderType": "market",
-        }
+        webhook_payload = order_templates.MES_EXIT.render()
         
-        order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, config.GLOBAL_QUANTITY, "Stopped webhook")
+        await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, config.GLOBAL_QUANTITY, "Stopped webhook")
         
-        print("Stopped message handling completed")
+        logger.info("Stopped message handling completed")
         
     except Exception as e:
-        print(f"Error handling stopped message: {e}")
+        logger.error("Error handling stopped message: %s", e)
 
-def handle_long_triggered_message(triggered_match, source="second_channel"):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_long_triggered_message(triggered_match, source="second_channel"):
     if position_tracker.has_open_order():
-        print("Order already open, skipping new order submission")
+        logger.info("Order already open, skipping new order submission")
         return
     
-    print(f"Long Triggered message received from {source}")
+    logger.info("Long Triggered message received from %s", source)
     
     ticker = config.TICKER_SYMBOL
     interval = int(triggered_match.group(2))
@@ -149,7 +200,7 @@ def handle_long_triggered_message(triggered_match, source="second_channel"):
     price = float(triggered_match.group(5))
     time_str = triggered_match.group(6)
     
-    print(f"Parsed values: Ticker={ticker}, Interval={interval}, Level={level}, Score={score}, Price={price}, Time={time_str}")
+    logger.info("Parsed values: Ticker=%s, Interval=%s, Level=%s, Score=%s, Price=%s, Time=%s", ticker, interval, level, score, price, time_str)
     
     is_buy = True
     order_type = 1
@@ -160,22 +211,22 @@ def handle_long_triggered_message(triggered_match, source="second_channel"):
         score_max = int(score_parts[1])
         
         if source == "second_channel":
-            if score_value < 5:
-                print(f"Score {score_value} is below minimum threshold of 5 for second channel, skipping trade")
+            if score_value < config.MIN_SIGNAL_SCORE:
+                logger.info("Score %s is below minimum threshold of %s for second channel, skipping trade", score_value, config.MIN_SIGNAL_SCORE)
                 return
         else:
-            if score_value < 5:
-                print(f"Score {score_value} is not greater than 5 for FBD endpoint, skipping trade")
+            if score_value < config.MIN_SIGNAL_SCORE:
+                logger.info("Score %s is below minimum threshold of %s for FBD endpoint, skipping trade", score_value, config.MIN_SIGNAL_SCORE)
                 return
         
         personal_qty = min(15, max(5, score_value * 2))
     else:
-        print(f"Invalid score format: {score}, skipping trade")
+        logger.info("Invalid score format: %s, skipping trade", score)
         return
     
     try:
         result1 = "SIMULATED_ORDER_RESULT"
-        print(f"Would submit personal order: qty={personal_qty}, is_buy={is_buy}, order_type={order_type}")
+        logger.info("Would submit personal order: qty=%s, is_buy=%s, order_type=%s", personal_qty, is_buy, order_type)
         webhook_qty = config.GLOBAL_QUANTITY
         order_info = {
             "action": "buy",
@@ -197,16 +248,11 @@ def handle_long_triggered_message(triggered_match, source="second_channel"):
             ]
         }
         position_tracker.save_open_order(order_info)
-        print("Order saved locally")
+        logger.info("Order saved locally")
         
         
         if webhook_qty > 0:
-            webhook_payload = {
-                "ticker": ticker,
-                "price": str(price),
-                "action": "buy",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_MARKET["buy"].render(price=str(price))
             
             additional_context = {
                 "source": source,
@@ -216,19 +262,20 @@ def handle_long_triggered_message(triggered_match, source="second_channel"):
                 "interval": interval
             }
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_qty, "Long Triggered webhook", is_entry_trade=True, additional_context=additional_context)
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_qty, "Long Triggered webhook", is_entry_trade=True, additional_context=additional_context)
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_qty} (must be > 0)")
+            logger.info("Skipping webhook submission - quantity is %s (must be > 0)", webhook_qty)
         
     except Exception as e:
-        print(f"Error submitting Long Triggered order: {e}")
+        logger.error("Error submitting Long Triggered order: %s", e)
 
-def handle_target_hit_message(target_match, source="fbd_endpoint"):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_target_hit_message(target_match, source="fbd_endpoint"):
     if not position_tracker.has_open_order():
-        print("No open order to close for target hit")
+        logger.info("No open order to close for target hit")
         return
     
-    print("Target 1 Hit message received - closing position")
+    logger.info("Target 1 Hit message received - closing position")
     
     ticker = config.TICKER_SYMBOL
     interval = int(target_match.group(2))
@@ -238,7 +285,7 @@ def handle_target_hit_message(target_match, source="fbd_endpoint"):
     profit = float(target_match.group(6))
     time_str = target_match.group(7)
     
-    print(f"Parsed target hit values: Ticker={ticker}, Interval={interval}, Level={level}, Target={target_price}, Entry={entry_price}, Profit={profit}, Time={time_str}")
+    logger.info("Parsed target hit values: Ticker=%s, Interval=%s, Level=%s, Target=%s, Entry=%s, Profit=%s, Time=%s", ticker, interval, level, target_price, entry_price, profit, time_str)
 
     message_id = message_parser.create_message_id(ticker, target_price, entry_price, profit, time_str)
     
@@ -248,12 +295,12 @@ def handle_target_hit_message(target_match, source="fbd_endpoint"):
     try:
         order_info = position_tracker.get_open_order_info()
         if not order_info:
-            print("Could not retrieve order info for target hit")
+            logger.warning("Could not retrieve order info for target hit")
             return
         
         order_source = order_info["order_info"].get("source", "unknown")
         if order_source != source:
-            print(f"Target 1 hit message ignored - order source is '{order_source}', only processing {source} orders")
+            logger.info("Target 1 hit message ignored - order source is '%s', only processing %s orders", order_source, source)
             return
         
         original_action = order_info["order_info"]["action"]
@@ -266,35 +313,23 @@ def handle_target_hit_message(target_match, source="fbd_endpoint"):
         webhook_close_qty = int(webhook_total_qty / 2)
         remaining_webhook_qty = webhook_total_qty - webhook_close_qty
         
-        print(f"Target 1 hit: Closing {webhook_close_qty} of {webhook_total_qty} webhook contracts, remaining: {remaining_webhook_qty}")
+        logger.info("Target 1 hit: Closing %s of %s webhook contracts, remaining: %s", webhook_close_qty, webhook_total_qty, remaining_webhook_qty)
         
         if webhook_close_qty >= 1:
-            webhook_payload = {
-                "ticker": ticker,
-                "price": str(target_price),
-                "action": "sell",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_MARKET["sell"].render(price=str(target_price))
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Target hit close webhook")
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Target hit close webhook")
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_close_qty} (must be >= 1)")
+            logger.info("Skipping webhook submission - quantity is %s (must be >= 1)", webhook_close_qty)
         
         if remaining_webhook_qty >= 1:
-            stop_price = entry_price - 3.0
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+            stop_price = entry_price - config.MES_STOP_POINTS
+            current_time = datetime.now().isoformat(" ", "microseconds")
             
-            stop_webhook_payload = {
-                "ticker": ticker,
-                "action": "sell",
-                "time": current_time,
-                "orderType": "stop",
-                "stopPrice": str(stop_price),
-                "quantityType": "fixed_quantity"
-            }
+            stop_webhook_payload = order_templates.MES_STOP["sell"].render(time=current_time, stopPrice=str(stop_price))
             
-            order_executor.send_webhook(stop_webhook_payload, config.WEBHOOK_URL, remaining_webhook_qty, "Target hit stop order webhook")
-            print(f"Stop order placed at {stop_price} (3 points below entry {entry_price}) for {remaining_webhook_qty} contract(s)")
+            await order_executor.send_webhook_async(stop_webhook_payload, config.WEBHOOK_URL, remaining_webhook_qty, "Target hit stop order webhook")
+            logger.info("Stop order placed at %s (%s points below entry %s) for %s contract(s)", stop_price, config.MES_STOP_POINTS, entry_price, remaining_webhook_qty)
             
             remaining_quantities = {
                 "personal": original_quantities.get("personal", 0),
@@ -303,25 +338,26 @@ def handle_target_hit_message(target_match, source="fbd_endpoint"):
             
             order_info["order_info"]["quantities"] = remaining_quantities
             position_tracker.save_open_order(order_info["order_info"])
-            print(f"Order updated with remaining quantities: {remaining_quantities}")
+            logger.info("Order updated with remaining quantities: %s", remaining_quantities)
         else:
-            print(f"Skipping stop order submission - quantity is {remaining_webhook_qty} (must be >= 1)")
+            logger.info("Skipping stop order submission - quantity is %s (must be >= 1)", remaining_webhook_qty)
             position_tracker.clear_open_order()
-            print("Position fully closed due to target hit")
+            logger.info("Position fully closed due to target hit")
         
-        print(f"Target 1 hit processed. Profit: {profit} pts")
+        logger.info("Target 1 hit processed. Profit: %s pts", profit)
         
-        message_parser.mark_message_processed(message_id)
+        await handler_executor.run(message_parser.mark_message_processed, message_id)
         
     except Exception as e:
-        print(f"Error handling target hit message: {e}")
+        logger.error("Error handling target hit message: %s", e)
 
-def handle_target2_hit_message(target2_match, source="second_channel"):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_target2_hit_message(target2_match, source="second_channel"):
     if not position_tracker.has_open_order():
-        print("No open order to close for target 2 hit")
+        logger.info("No open order to close for target 2 hit")
         return
     
-    print("Target 2 Hit message received - closing remaining position")
+    logger.info("Target 2 Hit message received - closing remaining position")
     
     ticker = config.TICKER_SYMBOL
     interval = int(target2_match.group(2))
@@ -331,7 +367,7 @@ def handle_target2_hit_message(target2_match, source="second_channel"):
     profit = float(target2_match.group(6))
     time_str = target2_match.group(7)
     
-    print(f"Parsed target 2 hit values: Ticker={ticker}, Interval={interval}, Level={level}, Target={target_price}, Entry={entry_price}, Profit={profit}, Time={time_str}")
+    logger.info("Parsed target 2 hit values: Ticker=%s, Interval=%s, Level=%s, Target=%s, Entry=%s, Profit=%s, Time=%s", ticker, interval, level, target_price, entry_price, profit, time_str)
     
     message_id = message_parser.create_message_id(ticker, target_price, entry_price, profit, time_str)
     
@@ -341,12 +377,12 @@ def handle_target2_hit_message(target2_match, source="second_channel"):
     try:
         order_info = position_tracker.get_open_order_info()
         if not order_info:
-            print("Could not retrieve order info for target 2 hit")
+            logger.warning("Could not retrieve order info for target 2 hit")
             return
         
         order_source = order_info["order_info"].get("source", "unknown")
         if order_source != source:
-            print(f"Target 2 hit message ignored - order source is '{order_source}', only processing {source} orders")
+            logger.info("Target 2 hit message ignored - order source is '%s', only processing %s orders", order_source, source)
             return
         
         original_action = order_info["order_info"]["action"]
@@ -355,31 +391,27 @@ def handle_target2_hit_message(target2_match, source="second_channel"):
         webhook_close_qty = original_quantities.get("webhook", 0)
         
         if webhook_close_qty > 0:
-            webhook_payload = {
-                "ticker": ticker,
-                "price": str(target_price),
-                "action": "exit",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_EXIT_AT.render(price=str(target_price))
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Target 2 close webhook")
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Target 2 close webhook")
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_close_qty} (must be > 0)")
+            logger.info("Skipping webhook submission - quantity is %s (must be > 0)", webhook_close_qty)
         
         position_tracker.clear_open_order()
-        print(f"Remaining position closed due to target 2 hit. Profit: {profit} pts")
+        logger.info("Remaining position closed due to target 2 hit. Profit: %s pts", profit)
         
-        message_parser.mark_message_processed(message_id)
+        await handler_executor.run(message_parser.mark_message_processed, message_id)
         
     except Exception as e:
-        print(f"Error handling target 2 hit message: {e}")
+        logger.error("Error handling target 2 hit message: %s", e)
 
-def handle_stop_loss_message(stop_loss_match, source="fbd_endpoint"):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_stop_loss_message(stop_loss_match, source="fbd_endpoint"):
     if not position_tracker.has_open_order():
-        print("No open order to close for stop loss hit")
+        logger.info("No open order to close for stop loss hit")
         return
     
-    print("Stop Loss Hit message received - closing position")
+    logger.info("Stop Loss Hit message received - closing position")
     
     ticker = config.TICKER_SYMBOL
     interval = int(stop_loss_match.group(2))
@@ -389,23 +421,23 @@ def handle_stop_loss_message(stop_loss_match, source="fbd_endpoint"):
     loss = float(stop_loss_match.group(6))
     time_str = stop_loss_match.group(7)
     
-    print(f"Parsed stop loss values: Ticker={ticker}, Interval={interval}, Level={level}, Entry={entry_price}, Exit={exit_price}, Loss={loss}, Time={time_str}")
+    logger.info("Parsed stop loss values: Ticker=%s, Interval=%s, Level=%s, Entry=%s, Exit=%s, Loss=%s, Time=%s", ticker, interval, level, entry_price, exit_price, loss, time_str)
     
     message_id = message_parser.create_message_id(ticker, exit_price, entry_price, loss, time_str)
     
     if message_parser.is_message_processed(message_id):
-        print(f"Stop loss message already processed (ID: {message_id}), skipping duplicate")
+        logger.info("Stop loss message already processed (ID: %s), skipping duplicate", message_id)
         return
     
     try:
         order_info = position_tracker.get_open_order_info()
         if not order_info:
-            print("Could not retrieve order info for stop loss hit")
+            logger.warning("Could not retrieve order info for stop loss hit")
             return
         
         order_source = order_info["order_info"].get("source", "unknown")
         if order_source != source:
-            print(f"Stop loss message ignored - order source is '{order_source}', only processing {source} orders")
+            logger.info("Stop loss message ignored - order source is '%s', only processing %s orders", order_source, source)
             return
         
         original_action = order_info["order_info"]["action"]
@@ -414,31 +446,27 @@ def handle_stop_loss_message(stop_loss_match, source="fbd_endpoint"):
         webhook_close_qty = original_quantities.get("webhook", 0)
         
         if webhook_close_qty > 0:
-            webhook_payload = {
-                "ticker": ticker,
-                "price": str(exit_price),
-                "action": "exit",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_EXIT_AT.render(price=str(exit_price))
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Stop loss close webhook")
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Stop loss close webhook")
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_close_qty} (must be > 0)")
+            logger.info("Skipping webhook submission - quantity is %s (must be > 0)", webhook_close_qty)
         
         position_tracker.clear_open_order()
-        print(f"Position closed due to stop loss hit. Loss: {loss} pts")
+        logger.info("Position closed due to stop loss hit. Loss: %s pts", loss)
         
-        message_parser.mark_message_processed(message_id)
+        await handler_executor.run(message_parser.mark_message_processed, message_id)
         
     except Exception as e:
-        print(f"Error handling stop loss message: {e}")
+        logger.error("Error handling stop loss message: %s", e)
 
-def handle_stop_loss_simple_message(stop_loss_match, source="second_channel"):
+@instrument_locks.serialized(config.TICKER_SYMBOL)
+async def handle_stop_loss_simple_message(stop_loss_match, source="second_channel"):
     if not position_tracker.has_open_order():
-        print("No open order to close for stop loss hit")
+        logger.info("No open order to close for stop loss hit")
         return
     
-    print("Stop Loss message received - closing position")
+    logger.info("Stop Loss message received - closing position")
     
     ticker = config.TICKER_SYMBOL
     interval = int(stop_loss_match.group(2))
@@ -448,7 +476,7 @@ def handle_stop_loss_simple_message(stop_loss_match, source="second_channel"):
     loss = float(stop_loss_match.group(6))
     time_str = datetime.now().isoformat()
     
-    print(f"Parsed stop loss values: Ticker={ticker}, Interval={interval}, Level={level}, Entry={entry_price}, Exit={exit_price}, Loss={loss}")
+    logger.info("Parsed stop loss values: Ticker=%s, Interval=%s, Level=%s, Entry=%s, Exit=%s, Loss=%s", ticker, interval, level, entry_price, exit_price, loss)
     
     message_id = message_parser.create_message_id(ticker, exit_price, entry_price, loss, time_str)
     
@@ -458,12 +486,12 @@ def handle_stop_loss_simple_message(stop_loss_match, source="second_channel"):
     try:
         order_info = position_tracker.get_open_order_info()
         if not order_info:
-            print("Could not retrieve order info for stop loss hit")
+            logger.warning("Could not retrieve order info for stop loss hit")
             return
         
         order_source = order_info["order_info"].get("source", "unknown")
         if order_source != source:
-            print(f"Stop loss message ignored - order source is '{order_source}', only processing {source} orders")
+            logger.info("Stop loss message ignored - order source is '%s', only processing %s orders", order_source, source)
             return
         
         original_action = order_info["order_info"]["action"]
@@ -472,24 +500,19 @@ def handle_stop_loss_simple_message(stop_loss_match, source="second_channel"):
         webhook_close_qty = original_quantities.get("webhook", 0)
         
         if webhook_close_qty > 0:
-            webhook_payload = {
-                "ticker": ticker,
-                "price": str(exit_price),
-                "action": "exit",
-                "orderType": "market"
-            }
+            webhook_payload = order_templates.MES_EXIT_AT.render(price=str(exit_price))
             
-            order_executor.send_webhook(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Stop loss close webhook")
+            await order_executor.send_webhook_async(webhook_payload, config.WEBHOOK_URL, webhook_close_qty, "Stop loss close webhook")
         else:
-            print(f"Skipping webhook submission - quantity is {webhook_close_qty} (must be > 0)")
+            logger.info("Skipping webhook submission - quantity is %s (must be > 0)", webhook_close_qty)
         
         position_tracker.clear_open_order()
-        print(f"Position closed due to stop loss hit. Loss: {loss} pts")
+        logger.info("Position closed due to stop loss hit. Loss: %s pts", loss)
         
-        message_parser.mark_message_processed(message_id)
+        await handler_executor.run(message_parser.mark_message_processed, message_id)
         
     except Exception as e:
-        print(f"Error handling stop loss message: {e}")
+        logger.error("Error handling stop loss message: %s", e)
 
 def is_gold_trend_aligned(action: str, trend: Optional[str]) -> bool:
     if trend is None:
@@ -502,443 +525,40 @@ def is_gold_trend_aligned(action: str, trend: Optional[str]) -> bool:
         return True
     return False
 
-def handle_gold_bullish_entry(price: str, target_50: Optional[str] = None):
-    if position_tracker.has_gold_order():
-        print("Gold order already open, skipping new order submission")
-        return True
-    
-    # global gold_trend
-    # if not is_gold_trend_aligned("buy", gold_trend):
-    #     print(f"Gold bullish entry skipped - trend mismatch. Current trend: {gold_trend}, requested action: buy")
-    #     return False
-    
-    print(f"Gold bullish entry received with price: {price}")
-    
-    try:
-        order_executor.send_cancel_webhook(config.GOLD_TICKER, config.GOLD_WEBHOOK_URL)
-        
-        original_action = "buy"
-        opposite_action = "sell"
-        
-        entry_webhook_payload = {
-            "ticker": config.GOLD_TICKER,
-            "action": original_action,
-            "price": price,
-            "quantity": str(config.GOLD_QUANTITY),
-            "orderType": "market"
-        }
-        
-        additional_context = {
-            "source": "gold_webhook",
-            "direction": "long"
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(entry_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold bullish entry webhook", is_entry_trade=True, additional_context=additional_context)
-        print(f"Gold bullish entry webhook sent successfully")
-
-        target_50_quantity = str(int(config.GOLD_QUANTITY / 1))
-        target_quantity = target_50_quantity
-        
-        target = None
-        if not target_50:
-            price_float = float(price)
-            target = str(price_float + 14.0)
-            print(f"No target provided, setting default target to {target} (entry price + 14 points)")
-        
-        if target_50:
-            target_webhook_payload = {
-                "ticker": config.GOLD_TICKER,
-                "action": opposite_action,
-                "price": target_50,
-                "orderType": "limit",
-                "quantity": target_quantity
-            }
-            order_executor.send_webhook_to_multiple_urls(target_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold target webhook")
-            print(f"Gold target webhook sent successfully at price: {target_50} for quantity: {target_quantity}")
+def busy_response(e: Exception, timestamp: str) -> JSONResponse:
+    logger.warning("Rejecting signal, executor is saturated: %s", e)
+    return JSONResponse(status_code=503, content={
+        "status": "error",
+        "message": f"Server busy: {str(e)}",
+        "timestamp": timestamp
+    })
 
-        if price:
-            price_float = float(price)
-            stop_price = price_float - 7.0
-            stop_webhook_payload = {
-                "ticker": config.GOLD_TICKER,
-                "action": opposite_action,
-                "orderType": "stop",
-                "stopPrice": str(stop_price),
-                "quantityType": "fixed_quantity",
-                "quantity": str(config.GOLD_QUANTITY)
-            }
-            order_executor.send_webhook_to_multiple_urls(stop_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold stop webhook")
-            print(f"Gold stop webhook sent successfully at price: {stop_price} (7 points below entry {price})")
-            stop = str(stop_price)
-        else:
-            stop = None
-        
-        
-        order_info = {
-            "action": original_action,
-            "ticker": config.GOLD_TICKER,
-            "price": price,
-            "quantity": config.GOLD_QUANTITY
-        }
-        position_tracker.save_gold_order(order_info)
-        print("Gold order saved locally")
-        return True
-        
-    except Exception as e:
-        print(f"Error processing gold bullish entry: {e}")
-        return False
-
-def handle_gold_bearish_entry(price: str, target_50: Optional[str] = None):
-    if position_tracker.has_gold_order():
-        print("Gold order already open, skipping new order submission")
-        return True
-    
-    # global gold_trend
-    # if not is_gold_trend_aligned("sell", gold_trend):
-    #     print(f"Gold bearish entry skipped - trend mismatch. Current trend: {gold_trend}, requested action: sell")
-    #     return False
-    
-    print(f"Gold bearish entry received with price: {price}")
-    
+async def accept_signal(strategy: str, item: dict, timestamp: str):
     try:
-        order_executor.send_cancel_webhook(config.GOLD_TICKER, config.GOLD_WEBHOOK_URL)
-        
-        original_action = "sell"
-        opposite_action = "buy"
-        entry_webhook_payload = {
-            "ticker": config.GOLD_TICKER,
-            "action": original_action,
-            "price": price,
-            "quantity": str(config.GOLD_QUANTITY),
-            "orderType": "market"
-        }
-        
-        additional_context = {
-            "source": "gold_webhook",
-            "direction": "short"
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(entry_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold bearish entry webhook", is_entry_trade=True, additional_context=additional_context)
-        print(f"Gold bearish entry webhook sent successfully")
-        target_50_quantity = str(int(config.GOLD_QUANTITY / 1))
-        
-        target = None
-        if not target_50:
-            price_float = float(price)
-            target = str(price_float - 14.0)
-            print(f"No target provided, setting default target to {target} (entry price - 14 points)")
-        
-        if target_50:
-            target_50_webhook_payload = {
-                "ticker": config.GOLD_TICKER,
-                "action": opposite_action,
-                "price": target_50,
-                "orderType": "limit",
-                "quantity": target_50_quantity
-            }
-            order_executor.send_webhook_to_multiple_urls(target_50_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold target_50 webhook")
-        
-        if price:
-            price_float = float(price)
-            stop_price = price_float + 7.0
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-            stop_webhook_payload = {
-                "ticker": config.GOLD_TICKER,
-                "action": opposite_action,
-                "time": current_time,
-                "orderType": "stop",
-                "stopPrice": str(stop_price),
-                "quantityType": "fixed_quantity",
-                "quantity": str(config.GOLD_QUANTITY)
-            }
-            order_executor.send_webhook_to_multiple_urls(stop_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold stop webhook")
-            stop = str(stop_price)
-        else:
-            stop = None
-        
-        order_info = {
-            "action": original_action,
-            "ticker": config.GOLD_TICKER,
-            "price": price,
-            "quantity": config.GOLD_QUANTITY,
-            "target_50": target_50,
-            "stop": stop
-        }
-        position_tracker.save_gold_order(order_info)
-        print("Gold order saved locally")
-        return True
-        
-    except Exception as e:
-        print(f"Error processing gold bearish entry: {e}")
-        return False
-
-def handle_gold_50_percent_target(quantity: Optional[str] = None):
-    print(f"Gold 50% target hit received")
-    
-    if not position_tracker.has_gold_order():
-        print("No open gold order to close for 50% target hit")
-        return
-    
-    try:
-        order_info = position_tracker.get_gold_order_info()
-        if not order_info:
-            print("Could not retrieve gold order info for 50% target hit")
-            return
-        
-        original_action = order_info["order_info"]["action"]
-        opposite_action = "sell" if original_action == "buy" else "buy"
-        entry_price = order_info["order_info"]["price"]
-        
-        target_quantity = quantity if quantity else str(int(config.GOLD_QUANTITY / 2))
-        
-        webhook_payload = {
-            "ticker": config.GOLD_TICKER,
-            "action": opposite_action,
-            "quantity": target_quantity
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold 50% target hit webhook")
-        print(f"Gold 50% target hit webhook sent successfully (opposite action: {opposite_action})")
-        
-        remaining_quantity = config.GOLD_QUANTITY - int(target_quantity)
-        if remaining_quantity > 0:
-            order_info["order_info"]["quantity"] = remaining_quantity
-            position_tracker.save_gold_order(order_info["order_info"])
-            print(f"Gold order updated with remaining quantity: {remaining_quantity}")
-            
-            stop_price = float(entry_price)
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-            
-            stop_webhook_payload = {
-                "ticker": config.GOLD_TICKER,
-                "action": opposite_action,
-                "time": current_time,
-                "orderType": "stop",
-                "stopPrice": str(stop_price),
-                "quantityType": "fixed_quantity",
-                "quantity": str(remaining_quantity)
-            }
-            
-            order_executor.send_webhook_to_multiple_urls(stop_webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold 50% target stop order webhook")
-            print(f"Stop order placed at entry price {stop_price} for {remaining_quantity} contract(s)")
-        else:
-            position_tracker.clear_gold_order()
-            print("Gold order cleared after 50% target hit")
-        
-    except Exception as e:
-        print(f"Error processing gold 50% target hit: {e}")
-
-def handle_gold_exit():
-    print(f"Gold exit received")
-    
-    try:
-        webhook_payload = {
-            "ticker": config.GOLD_TICKER,
-            "action": "exit",
-            "cancel": "true"
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(webhook_payload, [config.GOLD_WEBHOOK_URL], "Gold exit webhook")
-        print(f"Gold exit webhook sent successfully")
-        
-        position_tracker.clear_gold_order()
-        print("Gold order cleared after exit")
-        
-    except Exception as e:
-        print(f"Error processing gold exit: {e}")
-
-def handle_nq_bullish_entry(price: str, target_50: Optional[str] = None):
-    if position_tracker.has_nq_order():
-        print("NQ order already open, skipping new order submission")
-        return
-
-    print(f"NQ bullish entry received with price: {price}")
-
-    try:
-        order_executor.send_cancel_webhook(config.NQ_TICKER, config.NQ_WEBHOOK_URL)
-
-        signal_price = float(price)
-        take_profit_amount = abs(float(target_50) - signal_price) if target_50 else 30
-        if not target_50:
-            print(f"No target provided, using default take profit amount: {take_profit_amount} points")
-
-        bracket_payload = {
-            "ticker": config.NQ_TICKER,
-            "action": "buy",
-            "orderType": "market",
-            "signalPrice": signal_price,
-            "quantity": str(config.NQ_QUANTITY),
-            "takeProfit": {"amount": take_profit_amount},
-            "stopLoss": {"type": "stop", "amount": 20},
-        }
-
-        additional_context = {
-            "source": "nq_webhook",
-            "direction": "long",
-        }
-
-        order_executor.send_webhook_to_multiple_urls(
-            bracket_payload,
-            [config.NQ_WEBHOOK_URL],
-            "NQ bullish entry bracket webhook",
-            is_entry_trade=True,
-            additional_context=additional_context,
-        )
-        print("NQ bullish entry bracket webhook sent successfully")
-
-        target = target_50 if target_50 else str(signal_price + 30.0)
-        stop = str(signal_price - 20)
-        order_info = {
-            "action": "buy",
-            "ticker": config.NQ_TICKER,
-            "price": price,
-            "quantity": config.NQ_QUANTITY,
-            "stop": stop,
-            "target": target,
-        }
-        position_tracker.save_nq_order(order_info)
-        print("NQ order saved locally")
-
-    except Exception as e:
-        print(f"Error processing NQ bullish entry: {e}")
-
-def handle_nq_bearish_entry(price: str, target_50: Optional[str] = None):
-    if position_tracker.has_nq_order():
-        print("NQ order already open, skipping new order submission")
-        return
-
-    print(f"NQ bearish entry received with price: {price}")
-
-    try:
-        order_executor.send_cancel_webhook(config.NQ_TICKER, config.NQ_WEBHOOK_URL)
-
-        signal_price = float(price)
-        take_profit_amount = abs(signal_price - float(target_50)) if target_50 else 30
-        if not target_50:
-            print(f"No target provided, using default take profit amount: {take_profit_amount} points")
-
-        bracket_payload = {
-            "ticker": config.NQ_TICKER,
-            "action": "sell",
-            "orderType": "market",
-            "signalPrice": signal_price,
-            "quantity": str(config.NQ_QUANTITY),
-            "takeProfit": {"amount": take_profit_amount},
-            "stopLoss": {"type": "stop", "amount": 20},
-        }
-
-        additional_context = {
-            "source": "nq_webhook",
-            "direction": "short",
-        }
-
-        order_executor.send_webhook_to_multiple_urls(
-            bracket_payload,
-            [config.NQ_WEBHOOK_URL],
-            "NQ bearish entry bracket webhook",
-            is_entry_trade=True,
-            additional_context=additional_context,
+        intake_id = await intake_queue.journal_executor.run(
+            intake_queue.accept, BATCH_PROCESSORS[strategy][0], strategy, item, timestamp, order_ledger.signal_id(strategy, item)
         )
-        print("NQ bearish entry bracket webhook sent successfully")
-
-        target = target_50 if target_50 else str(signal_price - 30.0)
-        stop = str(signal_price + 20)
-        order_info = {
-            "action": "sell",
-            "ticker": config.NQ_TICKER,
-            "price": price,
-            "quantity": config.NQ_QUANTITY,
-            "stop": stop,
-            "target": target,
-        }
-        position_tracker.save_nq_order(order_info)
-        print("NQ order saved locally")
-
-    except Exception as e:
-        print(f"Error processing NQ bearish entry: {e}")
-
-def handle_nq_50_percent_target(quantity: Optional[str] = None):
-    print(f"NQ 50% target hit received")
-    
-    if not position_tracker.has_nq_order():
-        print("No open NQ order to close for 50% target hit")
-        return
-    
-    try:
-        order_info = position_tracker.get_nq_order_info()
-        if not order_info:
-            print("Could not retrieve NQ order info for 50% target hit")
-            return
-        
-        original_action = order_info["order_info"]["action"]
-        opposite_action = "sell" if original_action == "buy" else "buy"
-        entry_price = order_info["order_info"]["price"]
-        
-        target_quantity = quantity if quantity else str(int(config.NQ_QUANTITY / 2))
-        
-        webhook_payload = {
-            "ticker": config.NQ_TICKER,
-            "action": opposite_action,
-            "quantity": target_quantity
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(webhook_payload, [config.NQ_WEBHOOK_URL], "NQ 50% target hit webhook")
-        print(f"NQ 50% target hit webhook sent successfully (opposite action: {opposite_action})")
-        
-        remaining_quantity = config.NQ_QUANTITY - int(target_quantity)
-        if remaining_quantity > 0:
-            order_info["order_info"]["quantity"] = remaining_quantity
-            position_tracker.save_nq_order(order_info["order_info"])
-            print(f"NQ order updated with remaining quantity: {remaining_quantity}")
-            
-            stop_price = float(entry_price)
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-            
-            stop_webhook_payload = {
-                "ticker": config.NQ_TICKER,
-                "action": opposite_action,
-                "time": current_time,
-                "orderType": "stop",
-                "stopPrice": str(stop_price),
-                "quantityType": "fixed_quantity",
-                "quantity": str(remaining_quantity)
-            }
-            
-            order_executor.send_webhook_to_multiple_urls(stop_webhook_payload, [config.NQ_WEBHOOK_URL], "NQ 50% target stop order webhook")
-            print(f"Stop order placed at entry price {stop_price} for {remaining_quantity} contract(s)")
-        else:
-            position_tracker.clear_nq_order()
-            print("NQ order cleared after 50% target hit")
-        
-    except Exception as e:
-        print(f"Error processing NQ 50% target hit: {e}")
-
-def handle_nq_exit():
-    print(f"NQ exit received")
-    
-    try:
-        webhook_payload = {
-            "ticker": config.NQ_TICKER,
-            "action": "exit",
-            "cancel": "true"
-        }
-        
-        order_executor.send_webhook_to_multiple_urls(webhook_payload, [config.NQ_WEBHOOK_URL], "NQ exit webhook")
-        print(f"NQ exit webhook sent successfully")
-        
-        position_tracker.clear_nq_order()
-        print("NQ order cleared after exit")
-        
-    except Exception as e:
-        print(f"Error processing NQ exit: {e}")
+    except handler_executor.ExecutorSaturatedError as e:
+        return busy_response(e, timestamp)
+    logger.info("Accepted %s signal as %s", strategy, intake_id)
+    return JSONResponse(status_code=202, content={
+        "status": "accepted",
+        "intake_id": intake_id,
+        "timestamp": timestamp
+    })
 
 @app.post("/gold-trend")
-def handle_gold_trend_webhook(payload: dict):
+async def handle_gold_trend_webhook(payload: dict):
+    latency.mark("receive")
     timestamp = datetime.now().isoformat()
-    print(f"[{timestamp}] Received Gold Trend payload: {json.dumps(payload, indent=2)}")
-    
+    logger.info("Received Gold Trend payload")
+    logger.debug("Gold Trend payload: %s", log_pipeline.LazyJson(payload))
+    return await process_gold_trend_payload(payload, timestamp)
+
+async def process_gold_trend_payload(payload: dict, timestamp: str):
     try:
         trend = payload.get("trend")
+        latency.mark("parse")
         
         if not trend:
             return {
@@ -957,7 +577,7 @@ def handle_gold_trend_webhook(payload: dict):
         
         global gold_trend
         gold_trend = trend_lower
-        print(f"Gold trend updated to: {gold_trend}")
+        logger.info("Gold trend updated to: %s", gold_trend)
         
         return {
             "status": "success",
@@ -967,7 +587,7 @@ def handle_gold_trend_webhook(payload: dict):
         }
         
     except Exception as e:
-        print(f"Error processing Gold Trend webhook: {e}")
+        logger.error("Error processing Gold Trend webhook: %s", e)
         return {
             "status": "error",
             "message": f"Error processing webhook: {str(e)}",
@@ -975,230 +595,377 @@ def handle_gold_trend_webhook(payload: dict):
         }
 
 @app.post("/gold")
-def handle_gold_webhook(payload: dict):
+async def handle_gold_webhook(payload: dict):
+    return await handle_strategy_webhook("gold", payload)
+
+@app.post("/nq")
+async def handle_nq_webhook(payload: dict):
+    return await handle_strategy_webhook("nq", payload)
+
+@app.post("/strategies/{name}")
+async def handle_strategy_webhook(name: str, payload: dict):
+    latency.mark("receive")
     timestamp = datetime.now().isoformat()
-    print(f"[{timestamp}] Received Gold payload: {json.dumps(payload, indent=2)}")
-    
-    try:
-        action = payload.get("action")
-        
-        if not action:
-            return {
-                "status": "error",
-                "message": "Action is required",
-                "timestamp": timestamp
-            }
-        
-        if action == "bullish_entry":
-            price = payload.get("price")
-            if not price:
-                return {
-                    "status": "error",
-                    "message": "Price is required for bullish_entry action",
-                    "timestamp": timestamp
-                }
-            target_50 = payload.get("target_50")
-            result = handle_gold_bullish_entry(price, target_50)
-            if result is False:
-                return {
-                    "status": "success",
-                    "message": "Gold bullish entry skipped due to trend mismatch",
-                    "timestamp": timestamp
-                }
-            return {
-                "status": "success",
-                "message": "Gold bullish entry processed successfully",
-                "timestamp": timestamp
-            }
-        
-        elif action == "bearish_entry":
-            price = payload.get("price")
-            if not price:
-                return {
-                    "status": "error",
-                    "message": "Price is required for bearish_entry action",
-                    "timestamp": timestamp
-                }
-            target_50 = payload.get("target_50")
-            result = handle_gold_bearish_entry(price, target_50)
-            if result is False:
-                return {
-                    "status": "success",
-                    "message": "Gold bearish entry skipped due to trend mismatch",
-                    "timestamp": timestamp
-                }
-            return {
-                "status": "success",
-                "message": "Gold bearish entry processed successfully",
-                "timestamp": timestamp
-            }
-        
-        elif action == "exit":
-            handle_gold_exit()
-            return {
-                "status": "success",
-                "message": "Gold exit processed successfully",
-                "timestamp": timestamp
-            }
-        
-        else:
+    logger.info("Received %s payload", name)
+    logger.debug("%s payload: %s", name, log_pipeline.LazyJson(payload))
+    if config.INTAKE_QUEUE:
+        strategy = strategy_engine.get(name)
+        error = strategy.validate(payload) if strategy else f"Unknown strategy: {name}. Available strategies: {', '.join(strategy_engine.STRATEGIES)}"
+        if error:
             return {
                 "status": "error",
-                "message": f"Unknown action: {action}. Supported actions: bullish_entry, bearish_entry, exit",
+                "message": error,
                 "timestamp": timestamp
             }
-            
-    except Exception as e:
-        print(f"Error processing Gold webhook: {e}")
+        return await accept_signal(name, payload, timestamp)
+    with order_ledger.scope(order_ledger.signal_id(name, payload)):
+        return await process_strategy_payload(name, payload, timestamp)
+
+async def process_strategy_payload(name: str, payload: dict, timestamp: str):
+    strategy = strategy_engine.get(name)
+    if strategy is None:
         return {
             "status": "error",
-            "message": f"Error processing webhook: {str(e)}",
+            "message": f"Unknown strategy: {name}. Available strategies: {', '.join(strategy_engine.STRATEGIES)}",
             "timestamp": timestamp
         }
-
-@app.post("/nq")
-def handle_nq_webhook(payload: dict):
-    timestamp = datetime.now().isoformat()
-    print(f"[{timestamp}] Received NQ payload: {json.dumps(payload, indent=2)}")
-    
     try:
-        action = payload.get("action")
-        
-        if not action:
-            return {
-                "status": "error",
-                "message": "Action is required",
-                "timestamp": timestamp
-            }
-        
-        if action == "bullish_entry":
-            price = payload.get("price")
-            if not price:
-                return {
-                    "status": "error",
-                    "message": "Price is required for bullish_entry action",
-                    "timestamp": timestamp
-                }
-            target_50 = payload.get("target_50")
-            handle_nq_bullish_entry(price, target_50)
-            return {
-                "status": "success",
-                "message": "NQ bullish entry processed successfully",
-                "timestamp": timestamp
-            }
-        
-        elif action == "bearish_entry":
-            price = payload.get("price")
-            if not price:
-                return {
-                    "status": "error",
-                    "message": "Price is required for bearish_entry action",
-                    "timestamp": timestamp
-                }
-            target_50 = payload.get("target_50")
-            handle_nq_bearish_entry(price, target_50)
-            return {
-                "status": "success",
-                "message": "NQ bearish entry processed successfully",
-                "timestamp": timestamp
-            }
-        
-        elif action == "exit":
-            handle_nq_exit()
-            return {
-                "status": "success",
-                "message": "NQ exit processed successfully",
-                "timestamp": timestamp
-            }
-        
-        else:
-            return {
-                "status": "error",
-                "message": f"Unknown action: {action}. Supported actions: bullish_entry, bearish_entry, exit",
-                "timestamp": timestamp
-            }
-            
+        latency.mark("parse")
+        return await strategy.process(payload, timestamp)
     except Exception as e:
-        print(f"Error processing NQ webhook: {e}")
+        logger.error("Error processing %s webhook: %s", strategy.label, e)
         return {
             "status": "error",
             "message": f"Error processing webhook: {str(e)}",
             "timestamp": timestamp
         }
 
+@app.get("/latency")
+def get_latency():
+    return latency.snapshot()
+
+@app.get("/ledger")
+def get_ledger(minutes: float = 15):
+    return order_ledger.recent(minutes * 60)
+
+@app.get("/locks")
+def get_lock_stats():
+    return instrument_locks.get_stats()
+
+def collect_app_metrics():
+    yield "open_position", "gauge", "Whether an instrument currently has an open position", [
+        ("open_position", metrics.labels(instrument=slot), 1 if is_open else 0)
+        for slot, is_open in position_tracker.get_open_slots().items()
+    ]
+    dedupe_stats = message_parser.processed_messages.get_stats()
+    yield "dedupe_cache_entries", "gauge", "Message ids held by the dedupe cache", [
+        ("dedupe_cache_entries", (), dedupe_stats["entries"])
+    ]
+    yield "dedupe_cache_lookups_total", "counter", "Dedupe cache lookups by result", [
+        ("dedupe_cache_lookups_total", metrics.labels(result="hit"), dedupe_stats["hits"]),
+        ("dedupe_cache_lookups_total", metrics.labels(result="miss"), dedupe_stats["misses"]),
+    ]
+    notifier_stats = notifier.get_metrics()
+    yield "notifier_queue_depth", "gauge", "Notifications waiting to be sent", [
+        ("notifier_queue_depth", (), notifier_stats["queued"])
+    ]
+    yield "notifier_dropped_total", "counter", "Notifications dropped because the queue was full", [
+        ("notifier_dropped_total", (), notifier_stats["dropped"])
+    ]
+    state_stats = state_store.get_metrics()
+    yield "state_store_pending_writes", "gauge", "State snapshots waiting for the writer thread", [
+        ("state_store_pending_writes", (), state_stats["pending"])
+    ]
+    yield "state_store_batches_total", "counter", "State writer batches flushed", [
+        ("state_store_batches_total", (), state_stats["batches"])
+    ]
+    yield "state_store_writes_total", "counter", "State snapshot files written", [
+        ("state_store_writes_total", (), state_stats["writes"])
+    ]
+    yield "state_store_fsyncs_total", "counter", "fsync calls made by the state writer", [
+        ("state_store_fsyncs_total", (), state_stats["fsyncs"])
+    ]
+    yield "state_store_recoveries_total", "counter", "State snapshots recovered from a temp file or backup", [
+        ("state_store_recoveries_total", (), state_stats["recoveries"])
+    ]
+    yield "ws_ingest_connections", "gauge", "Open WebSocket ingest connections", [
+        ("ws_ingest_connections", (), ingest_connections)
+    ]
+    yield "log_records_dropped_total", "counter", "Log records dropped because the log queue was full", [
+        ("log_records_dropped_total", (), log_pipeline.get_dropped())
+    ]
+
+metrics.register_collector(collect_app_metrics)
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/brackets/{bracket_id}")
+def get_bracket_status(bracket_id: str):
+    bracket = order_executor.get_bracket(bracket_id)
+    if bracket is None:
+        return {
+            "status": "error",
+            "message": f"Unknown bracket: {bracket_id}"
+        }
+    return bracket.to_dict()
+
 @app.post("/fbd")
-def handle_fbd_webhook(payload: dict):
+async def handle_fbd_webhook(payload: dict):
+    latency.mark("receive")
     timestamp = datetime.now().isoformat()
-    print(f"[{timestamp}] Received FBD payload: {json.dumps(payload, indent=2)}")
-    
+    logger.info("Received FBD payload")
+    logger.debug("FBD payload: %s", log_pipeline.LazyJson(payload))
+    
+    embeds = payload.get("embeds", [])
+    if not isinstance(embeds, list) or len(embeds) == 0:
+        logger.info("No embeds found in payload")
+        return {"status": "error", "message": "No embeds found in payload"}
+    if len(embeds) > 1:
+        logger.warning("FBD payload has %s embeds, only the first is processed; send bursts to /batch", len(embeds))
+    if config.INTAKE_QUEUE and isinstance(embeds[0], dict) and embeds[0].get("description"):
+        return await accept_signal("fbd", embeds[0], timestamp)
+    with order_ledger.scope(order_ledger.signal_id("fbd", embeds[0])):
+        return await process_fbd_embed(embeds[0], timestamp)
+
+async def process_fbd_embed(embed: dict, timestamp: str):
     try:
-        embeds = payload.get("embeds", [])
-        if not embeds or len(embeds) == 0:
-            print("No embeds found in payload")
-            return {"status": "error", "message": "No embeds found in payload"}
-        
-        embed_content = embeds[0].get("description", "")
+        embed_content = embed.get("description", "")
         if not embed_content:
-            print("No description found in embed")
+            logger.info("No description found in embed")
             return {"status": "error", "message": "No description found in embed"}
         
-        print(f"Processing embed description: {embed_content}")
+        logger.debug("Processing embed description: %s", embed_content)
         
-        target_hit_match = message_parser.parse_target_hit_message(embed_content)
-        if target_hit_match:
-            print("Target 1 Hit message found in FBD webhook")
-            handle_target_hit_message(target_hit_match, source="fbd_endpoint")
+        message = message_parser.classify_fbd_message(embed_content)
+        latency.mark("parse")
+        if message is None:
+            logger.info("No Long Triggered, Target 1, Target 2, or Stop Loss pattern matched in embed description")
             return {
-                "status": "success", 
-                "message": "Target 1 Hit message processed successfully",
+                "status": "info", 
+                "message": "No Long Triggered, Target 1, Target 2, or Stop Loss pattern matched",
                 "timestamp": timestamp
             }
         
-        target2_hit_match = message_parser.parse_target2_hit_message(embed_content)
-        if target2_hit_match:
-            print("Target 2 Hit message found in FBD webhook")
-            handle_target2_hit_message(target2_hit_match, source="fbd_endpoint")
+        if message.kind == message_parser.LONG_TRIGGERED:
+            logger.info("Long Triggered message found in FBD webhook")
+            await handle_long_triggered_message(message.match, source="fbd_endpoint")
             return {
                 "status": "success", 
-                "message": "Target 2 Hit message processed successfully",
+                "message": "Long Triggered message processed successfully",
                 "timestamp": timestamp
             }
         
-        stop_loss_match = message_parser.parse_stop_loss_message(embed_content)
-        if stop_loss_match:
-            print("Stop Loss Hit message found in FBD webhook")
-            handle_stop_loss_message(stop_loss_match, source="fbd_endpoint")
+        if message.kind == message_parser.TARGET_1_HIT:
+            logger.info("Target 1 Hit message found in FBD webhook")
+            await handle_target_hit_message(message.match, source="fbd_endpoint")
             return {
                 "status": "success", 
-                "message": "Stop Loss Hit message processed successfully",
+                "message": "Target 1 Hit message processed successfully",
                 "timestamp": timestamp
             }
         
-        triggered_match = message_parser.parse_long_triggered_message(embed_content)
-        if triggered_match:
-            print("Long Triggered message found in FBD webhook " + datetime.now().isoformat())
-            handle_long_triggered_message(triggered_match, source="fbd_endpoint")
+        if message.kind == message_parser.TARGET_2_HIT:
+            logger.info("Target 2 Hit message found in FBD webhook")
+            await handle_target2_hit_message(message.match, source="fbd_endpoint")
             return {
                 "status": "success", 
-                "message": "Long Triggered message processed successfully",
-                "timestamp": timestamp
-            }
-        else:
-            print("No Long Triggered, Target 1, Target 2, or Stop Loss pattern matched in embed description")
-            return {
-                "status": "info", 
-                "message": "No Long Triggered, Target 1, Target 2, or Stop Loss pattern matched",
+                "message": "Target 2 Hit message processed successfully",
                 "timestamp": timestamp
             }
+        
+        logger.info("Stop Loss Hit message found in FBD webhook")
+        await handle_stop_loss_message(message.match, source="fbd_endpoint")
+        return {
+            "status": "success", 
+            "message": "Stop Loss Hit message processed successfully",
+            "timestamp": timestamp
+        }
             
     except Exception as e:
-        print(f"Error processing FBD webhook: {e}")
+        logger.error("Error processing FBD webhook: %s", e)
         return {
             "status": "error", 
             "message": f"Error processing webhook: {str(e)}",
             "timestamp": timestamp
         }
 
+BATCH_PROCESSORS = {
+    **{
+        name: (strategy.ticker, functools.partial(process_strategy_payload, name))
+        for name, strategy in strategy_engine.STRATEGIES.items()
+    },
+    "gold-trend": (config.GOLD_TICKER, process_gold_trend_payload),
+    "fbd": (config.TICKER_SYMBOL, process_fbd_embed),
+}
+
+async def execute_intake(entry: Dict) -> Dict:
+    _, process = BATCH_PROCESSORS[entry["strategy"]]
+    with order_ledger.scope(entry.get("scope") or entry["id"]), order_executor.awaiting_brackets():
+        return await process(entry["item"], entry["timestamp"])
+
+@app.get("/intake/{intake_id}")
+def get_intake_status(intake_id: str):
+    status = intake_queue.status(intake_id)
+    if status is None:
+        return {"status": "error", "message": f"Unknown intake id: {intake_id}"}
+    return status
+
+def plan_signal(signal, fields: Dict):
+    strategy = None
+    item_payload = None
+    if isinstance(signal, dict):
+        strategy = signal.get("strategy") or str(signal.get("endpoint") or "").lstrip("/") or None
+        item_payload = signal.get("payload")
+    if strategy not in BATCH_PROCESSORS or not isinstance(item_payload, dict):
+        return [{
+            **fields,
+            "strategy": strategy,
+            "status": "error",
+            "message": f"Each signal needs a payload object and a strategy: {', '.join(BATCH_PROCESSORS)}"
+        }], None, []
+
+    instrument, process = BATCH_PROCESSORS[strategy]
+    if strategy == "fbd":
+        embeds = item_payload.get("embeds", [])
+        if not isinstance(embeds, list) or len(embeds) == 0:
+            return [{**fields, "strategy": strategy, "status": "error", "message": "No embeds found in payload"}], None, []
+        results = [{**fields, "embed": embed_index, "strategy": strategy} for embed_index in range(len(embeds))]
+        return results, instrument, [(result, process, embed) for result, embed in zip(results, embeds)]
+
+    result = {**fields, "strategy": strategy}
+    return [result], instrument, [(result, process, item_payload)]
+
+async def run_lane(jobs: List[tuple], timestamp: str):
+    for result, process, item in jobs:
+        try:
+            with order_ledger.scope(order_ledger.signal_id(result["strategy"], item)):
+                result.update(await process(item, timestamp))
+        except Exception as e:
+            logger.error("Error processing %s signal: %s", result["strategy"], e)
+            result.update({"status": "error", "message": f"Error processing signal: {str(e)}"})
+
+@app.post("/batch")
+async def handle_batch_webhook(payload: dict):
+    timestamp = datetime.now().isoformat()
+    signals = payload.get("signals")
+    if not isinstance(signals, list) or len(signals) == 0:
+        return {
+            "status": "error",
+            "message": "signals must be a non-empty list",
+            "timestamp": timestamp
+        }
+    if len(signals) > config.BATCH_MAX_SIGNALS:
+        return {
+            "status": "error",
+            "message": f"Batch of {len(signals)} signals exceeds the limit of {config.BATCH_MAX_SIGNALS}",
+            "timestamp": timestamp
+        }
+    logger.info("Received batch of %s signal(s)", len(signals))
+    logger.debug("Batch payload: %s", log_pipeline.LazyJson(payload))
+
+    results: List[Dict] = []
+    lanes: Dict[str, List[tuple]] = {}
+    for index, signal in enumerate(signals):
+        signal_results, instrument, jobs = plan_signal(signal, {"index": index})
+        results.extend(signal_results)
+        if jobs:
+            lanes.setdefault(instrument, []).extend(jobs)
+
+    await asyncio.gather(*[run_lane(jobs, timestamp) for jobs in lanes.values()])
+
+    errors = sum(1 for result in results if result.get("status") == "error")
+    return {
+        "status": "success" if errors == 0 else "partial",
+        "processed": len(results),
+        "errors": errors,
+        "results": results,
+        "timestamp": timestamp
+    }
+
+ingest_connections = 0
+
+metrics.describe("ws_ingest_messages_total", "counter", "Signals received over the WebSocket ingest channel, by strategy and outcome")
+
+@app.websocket("/ws/ingest")
+async def ingest_websocket(websocket: WebSocket):
+    global ingest_connections
+    await websocket.accept()
+    ingest_connections += 1
+    window = asyncio.Semaphore(config.WS_INGEST_WINDOW)
+    send_lock = asyncio.Lock()
+    lanes: Dict[str, asyncio.Queue] = {}
+    workers: List[asyncio.Task] = []
+    closed = False
+    sequence = 0
+
+    async def send(message: Dict):
+        if closed:
+            return
+        try:
+            async with send_lock:
+                await websocket.send_json(message)
+        except Exception as e:
+            logger.debug("Could not send ingest ack: %s", e)
+
+    async def acknowledge(seq: int, message_id, results: List[Dict]):
+        errors = sum(1 for result in results if result.get("status") == "error")
+        for result in results:
+            metrics.inc("ws_ingest_messages_total", metrics.labels(strategy=result.get("strategy") if result.get("strategy") in BATCH_PROCESSORS else "unknown", status=result.get("status")))
+        ack = {"type": "ack", "seq": seq, "status": "success" if errors == 0 else "error", "results": results}
+        if message_id is not None:
+            ack["id"] = message_id
+        await send(ack)
+        window.release()
+
+    async def lane_worker(queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            seq, message_id, results, jobs, timestamp = item
+            await run_lane(jobs, timestamp)
+            await acknowledge(seq, message_id, results)
+
+    logger.info("Ingest connection opened from %s", websocket.client)
+    await send({"type": "ready", "window": config.WS_INGEST_WINDOW})
+    try:
+        while True:
+            await window.acquire()
+            try:
+                text = await websocket.receive_text()
+            except (WebSocketDisconnect, KeyError, RuntimeError):
+                window.release()
+                break
+            sequence += 1
+            timestamp = datetime.now().isoformat()
+            try:
+                message = json.loads(text)
+            except ValueError as e:
+                await acknowledge(sequence, None, [{"status": "error", "message": f"Invalid JSON: {e}"}])
+                continue
+
+            message_id = message.get("id") if isinstance(message, dict) else None
+            results, instrument, jobs = plan_signal(message, {})
+            if not jobs:
+                await acknowledge(sequence, message_id, results)
+                continue
+
+            queue = lanes.get(instrument)
+            if queue is None:
+                queue = asyncio.Queue()
+                lanes[instrument] = queue
+                workers.append(asyncio.create_task(lane_worker(queue)))
+            queue.put_nowait((sequence, message_id, results, jobs, timestamp))
+    finally:
+        closed = True
+        ingest_connections -= 1
+        for queue in lanes.values():
+            queue.put_nowait(None)
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.info("Ingest connection from %s closed after %s message(s)", websocket.client, sequence)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,18 +1,52 @@
 import re
-import hashlib
+from dataclasses import dataclass
 from typing import Optional, Match
 import config
+import dedupe_cache
 
-processed_messages = set()
+LONG_TRIGGERED = "long_triggered"
+TARGET_1_HIT = "target_1_hit"
+TARGET_2_HIT = "target_2_hit"
+STOP_LOSS_HIT = "stop_loss_hit"
 
-def create_message_id(ticker: str, target_price: float, entry_price: float, profit: float, time_str: str) -> str:
+_FBD_KIND_PATTERN = re.compile(r"\n(Score|Target 1|Target 2|Exit): \*\*", re.IGNORECASE)
+
+_FBD_KINDS = {
+    "score": LONG_TRIGGERED,
+    "target 1": TARGET_1_HIT,
+    "target 2": TARGET_2_HIT,
+    "exit": STOP_LOSS_HIT,
+}
+
+@dataclass
+class FbdMessage:
+    kind: str
+    match: Match
+    ticker: str
+    interval: int
+    level: float
+    time: str
+    score: Optional[str] = None
+    price: Optional[float] = None
+    target: Optional[float] = None
+    entry: Optional[float] = None
+    exit: Optional[float] = None
+    points: Optional[float] = None
+
+processed_messages = dedupe_cache.DedupeCache(
+    config.DEDUPE_MAX_ENTRIES,
+    config.DEDUPE_TTL,
+    config.DEDUPE_CACHE_FILE or None
+)
+
+def create_message_id(ticker: str, target_price: float, entry_price: float, profit: float, time_str: str) -> int:
     message_content = f"{ticker}_{target_price}_{entry_price}_{profit}_{time_str}"
-    return hashlib.md5(message_content.encode()).hexdigest()
+    return dedupe_cache.hash_key(message_content)
 
-def is_message_processed(message_id: str) -> bool:
+def is_message_processed(message_id: int) -> bool:
     return message_id in processed_messages
 
-def mark_message_processed(message_id: str):
+def mark_message_processed(message_id: int):
     processed_messages.add(message_id)
 
 def parse_trim_message(content: str) -> Optional[Match]:
@@ -39,3 +73,30 @@ def parse_stop_loss_simple_message(content: str) -> Optional[Match]:
 def parse_es_order_message(content: str) -> Optional[Match]:
     return config.PATTERN.search(content)
 
+
+def _build_fbd_message(kind: str, match: Match) -> FbdMessage:
+    groups = match.groups()
+    if kind == LONG_TRIGGERED:
+        ticker, interval, level, score, price, time_str = groups
+        return FbdMessage(kind, match, ticker, int(interval), float(level), time_str, score=score, price=float(price))
+    ticker, interval, level, first, second, points, time_str = groups
+    if kind == STOP_LOSS_HIT:
+        return FbdMessage(kind, match, ticker, int(interval), float(level), time_str, entry=float(first), exit=float(second), points=float(points))
+    return FbdMessage(kind, match, ticker, int(interval), float(level), time_str, target=float(first), entry=float(second), points=float(points))
+
+_FBD_EXTRACTORS = {
+    TARGET_1_HIT: parse_target_hit_message,
+    TARGET_2_HIT: parse_target2_hit_message,
+    STOP_LOSS_HIT: parse_stop_loss_message,
+    LONG_TRIGGERED: parse_long_triggered_message,
+}
+
+def classify_fbd_message(content: str) -> Optional[FbdMessage]:
+    kind_match = _FBD_KIND_PATTERN.search(content)
+    if not kind_match:
+        return None
+    kind = _FBD_KINDS[kind_match.group(1).lower()]
+    match = _FBD_EXTRACTORS[kind](content)
+    if not match:
+        return None
+    return _build_fbd_message(kind, match)
@@ -0,0 +1,145 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]
+
+_local = threading.local()
+_shards: List[Dict] = []
+_shards_lock = threading.Lock()
+_help: Dict[str, Tuple[str, str]] = {}
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+def _shard() -> Dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = {"counters": defaultdict(float), "histograms": {}}
+        _local.shard = shard
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+def describe(name: str, metric_type: str, help_text: str):
+    _help[name] = (metric_type, help_text)
+
+def labels(**values) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in values.items()))
+
+def inc(name: str, label_set: Labels = (), value: float = 1.0):
+    _shard()["counters"][(name, label_set)] += value
+
+def observe(name: str, label_set: Labels, seconds: float):
+    histograms = _shard()["histograms"]
+    key = (name, label_set)
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = [[0] * (len(DURATION_BUCKETS) + 1), 0.0]
+        histograms[key] = histogram
+    histogram[0][bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+    histogram[1] += seconds
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+    _collectors.append(collector)
+
+def _format_labels(label_set: Labels) -> str:
+    if not label_set:
+        return ""
+    parts = []
+    for key, value in label_set:
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+def _aggregate():
+    counters: Dict = defaultdict(float)
+    histograms: Dict = {}
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        for key, value in list(shard["counters"].items()):
+            counters[key] += value
+        for key, (buckets, total) in list(shard["histograms"].items()):
+            merged = histograms.setdefault(key, [[0] * (len(DURATION_BUCKETS) + 1), 0.0])
+            for index, count in enumerate(list(buckets)):
+                merged[0][index] += count
+            merged[1] += total
+    return counters, histograms
+
+def render() -> str:
+    counters, histograms = _aggregate()
+    lines: List[str] = []
+    emitted = set()
+
+    def header(name: str, default_type: str):
+        if name in emitted:
+            return
+        emitted.add(name)
+        metric_type, help_text = _help.get(name, (default_type, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    for (name, label_set), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(label_set)} {_format_value(value)}")
+
+    for (name, label_set), (buckets, total) in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS + (float("inf"),), buckets):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(label_set + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(label_set)} {repr(total)}")
+        lines.append(f"{name}_count{_format_labels(label_set)} {cumulative}")
+
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception:
+            continue
+        for name, metric_type, help_text, samples in families:
+            if name not in emitted:
+                emitted.add(name)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, label_set, value in samples:
+                lines.append(f"{sample_name}{_format_labels(label_set)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+describe("http_requests_total", "counter", "HTTP requests handled, by route, method and status")
+describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            inc("http_requests_total", labels(route=route_path, method=scope["method"], status=status_holder[0]))
+            observe("http_request_duration_seconds", labels(route=route_path), time.perf_counter() - started)
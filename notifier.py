@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import httpx
+import config
+
+logger = logging.getLogger(__name__)
+
+MAX_COLLAPSED_PER_ENTRY = 20
+
+_queue: deque = deque()
+_cond = threading.Condition()
+_worker: Optional[threading.Thread] = None
+_stopping = False
+
+_metrics = {
+    "enqueued": 0,
+    "sent": 0,
+    "failed": 0,
+    "coalesced": 0,
+    "collapsed": 0,
+    "dropped": 0,
+    "last_latency_ms": 0.0,
+}
+
+class _Notification:
+    __slots__ = ("title", "messages", "tags", "priority", "enqueued_at")
+
+    def __init__(self, title: str, message: str, tags: str, priority: str):
+        self.title = title
+        self.messages = [message]
+        self.tags = tags
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+
+def build_order_message(payload: Dict, quantity: Optional[int], operation_name: str, additional_context: Optional[Dict] = None):
+    ticker = payload.get("ticker", "Unknown")
+    action = payload.get("action", "Unknown")
+    price = payload.get("price", "")
+    order_type = payload.get("orderType", "market")
+
+    qty = quantity if quantity is not None else payload.get("quantity", "Unknown")
+
+    title = f"Order Placed: {ticker} {action.upper()}"
+
+    message_parts = [
+        f"Ticker: {ticker}",
+        f"Action: {action.upper()}",
+        f"Quantity: {qty}",
+    ]
+
+    if price:
+        message_parts.append(f"Price: {price}")
+
+    if order_type and order_type != "market":
+        message_parts.append(f"Order Type: {order_type}")
+
+    if additional_context:
+        for key, label in (
+            ("source", "Source"),
+            ("direction", "Direction"),
+            ("letter", "Letter"),
+            ("score", "Score"),
+            ("level", "Level"),
+            ("interval", "Interval"),
+            ("stop_value", "Stop"),
+        ):
+            value = additional_context.get(key)
+            if value:
+                message_parts.append(f"{label}: {value}")
+
+    message_parts.append(f"Operation: {operation_name}")
+
+    return title, "\n".join(message_parts)
+
+def notify(title: str, message: str, tags: str = "chart_with_upwards_trend", priority: str = "default") -> bool:
+    if not config.NTFY_URL:
+        return False
+
+    with _cond:
+        if _stopping:
+            _metrics["dropped"] += 1
+            return False
+        _metrics["enqueued"] += 1
+        if len(_queue) >= config.NTFY_QUEUE_SIZE:
+            tail = _queue[-1]
+            if len(tail.messages) >= MAX_COLLAPSED_PER_ENTRY:
+                _metrics["dropped"] += 1
+                return False
+            tail.messages.append(message)
+            _metrics["collapsed"] += 1
+        else:
+            _queue.append(_Notification(title, message, tags, priority))
+        _ensure_worker()
+        _cond.notify()
+    return True
+
+def notify_order(payload: Dict, quantity: Optional[int], operation_name: str, additional_context: Optional[Dict] = None) -> bool:
+    try:
+        title, message = build_order_message(payload, quantity, operation_name, additional_context)
+    except Exception as e:
+        logger.error("Error building ntfy notification: %s", e)
+        return False
+    return notify(title, message)
+
+def _ensure_worker():
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = threading.Thread(target=_run, name="ntfy-notifier", daemon=True)
+        _worker.start()
+
+def _take_batch() -> List[_Notification]:
+    with _cond:
+        while not _queue and not _stopping:
+            _cond.wait()
+        if not _queue:
+            return []
+        deadline = _queue[0].enqueued_at + config.NTFY_COALESCE_WINDOW
+        while not _stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _cond.wait(remaining)
+        batch = list(_queue)
+        _queue.clear()
+        return batch
+
+def _merge(batch: List[_Notification]):
+    messages = [message for notification in batch for message in notification.messages]
+    if len(messages) == 1:
+        first = batch[0]
+        return first.title, messages[0], first.tags, first.priority
+    _metrics["coalesced"] += len(messages) - 1
+    return f"{len(messages)} Orders Placed", "\n\n".join(messages), batch[0].tags, batch[0].priority
+
+def _send(client: httpx.Client, batch: List[_Notification]):
+    title, message, tags, priority = _merge(batch)
+    headers = {
+        "Title": title,
+        "Priority": priority,
+        "Tags": tags
+    }
+    started = time.perf_counter()
+    try:
+        response = client.post(config.NTFY_URL, content=message.encode("utf-8"), headers=headers)
+        response.raise_for_status()
+        _metrics["sent"] += 1
+        logger.info("ntfy notification sent: %s", title)
+    except Exception as e:
+        _metrics["failed"] += 1
+        logger.error("Error sending ntfy notification: %s", e)
+    _metrics["last_latency_ms"] = (time.perf_counter() - started) * 1000
+
+def _run():
+    with httpx.Client(timeout=config.NTFY_TIMEOUT) as client:
+        while True:
+            batch = _take_batch()
+            if not batch:
+                return
+            _send(client, batch)
+
+def get_metrics() -> Dict:
+    with _cond:
+        metrics = dict(_metrics)
+        metrics["queued"] = len(_queue)
+    return metrics
+
+def shutdown(timeout: float = 5.0):
+    global _stopping
+    with _cond:
+        _stopping = True
+        _cond.notify_all()
+    if _worker is not None:
+        _worker.join(timeout)
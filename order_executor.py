@@ -1,148 +1,577 @@
-import requests
+import logging
+import asyncio
+import hashlib
+import threading
 import time
-from typing import Dict, List, Optional, Union
+import uuid
+import httpx
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
 import config
+import csv_logger
+import latency
+import metrics
+import notifier
+import order_ledger
+import order_templates
+import retry_policy
 
-def send_ntfy_notification(payload: Dict, quantity: Optional[int], operation_name: str, additional_context: Optional[Dict] = None):
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+MAX_TRACKED_BRACKETS = 500
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+_destination_labels: Dict[str, metrics.Labels] = {}
+_bracket_tasks: Dict[str, asyncio.Task] = {}
+_in_bracket: ContextVar[bool] = ContextVar("in_bracket", default=False)
+_await_brackets: ContextVar[bool] = ContextVar("await_brackets", default=False)
+
+metrics.describe("webhook_attempts_total", "counter", "Outbound webhook POST attempts by destination")
+metrics.describe("webhook_retries_total", "counter", "Outbound webhook retries by destination")
+metrics.describe("webhook_failures_total", "counter", "Outbound webhook submissions that did not succeed, by destination and outcome")
+
+@dataclass
+class DispatchResult:
+    url: str
+    operation_name: str
+    status: str = "pending"
+    attempts: int = 0
+    latency_ms: float = 0.0
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("success", "duplicate")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "operation": self.operation_name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "latency_ms": round(self.latency_ms, 3),
+            "status_code": self.status_code,
+            "error": self.error,
+            "idempotency_key": self.idempotency_key,
+        }
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="order-dispatch", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+async def _in_context(trace: Optional[latency.Trace], scope: Optional[order_ledger.Scope], coro: Coroutine) -> Any:
+    latency.set_trace(trace)
+    order_ledger.set_scope(scope)
+    return await coro
+
+def submit(coro: Coroutine) -> Future:
+    trace = latency.current_trace()
+    scope = order_ledger.current_scope()
+    if trace is not None or scope is not None:
+        coro = _in_context(trace, scope, coro)
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+def _run(coro: Coroutine) -> Any:
+    return submit(coro).result()
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def _get_client(url: str) -> httpx.AsyncClient:
+    origin = _origin(url)
+    client = _clients.get(origin)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.WEBHOOK_POOL_MAXSIZE,
+                max_keepalive_connections=config.WEBHOOK_POOL_MAXSIZE,
+                keepalive_expiry=config.WEBHOOK_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(config.WEBHOOK_READ_TIMEOUT, connect=config.WEBHOOK_CONNECT_TIMEOUT),
+        )
+        _clients[origin] = client
+    return client
+
+async def _close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+async def _warm_up(urls: List[str]):
+    for url in urls:
+        try:
+            await _get_client(url).head(_origin(url))
+        except Exception as e:
+            logger.warning("Connection warm-up failed for %s: %s", _origin(url), e)
+
+def warm_up(urls: List[str]):
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if urls:
+        submit(_warm_up(urls))
+
+async def _drain_brackets(timeout: float):
+    tasks = [task for task in _bracket_tasks.values() if not task.done()]
+    if not tasks:
+        return
+    logger.info("Waiting for %s in-flight bracket(s) before closing broker connections", len(tasks))
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    if pending:
+        logger.warning("%s bracket(s) still in flight after %ss, closing broker connections anyway", len(pending), timeout)
+
+def shutdown():
+    global _loop, _loop_thread
+    with _loop_lock:
+        loop, thread = _loop, _loop_thread
+        _loop = None
+        _loop_thread = None
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(_drain_brackets(config.BRACKET_DRAIN_TIMEOUT), loop).result()
+    asyncio.run_coroutine_threadsafe(_close_clients(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join()
+    loop.close()
+
+def _leg_kind(payload: Mapping) -> str:
+    action = payload.get("action")
+    order_type = payload.get("orderType")
+    if action == "cancel":
+        return "cancel"
+    if action == "exit":
+        return "exit"
+    if order_type == "stop":
+        return "stop"
+    if order_type == "limit":
+        return "target"
+    return "entry"
+
+def send_ntfy_notification(payload: Mapping, quantity: Optional[int], operation_name: str, additional_context: Optional[Dict] = None):
+    notifier.notify_order(payload, quantity, operation_name, additional_context)
+
+def _metric_labels(url: str) -> metrics.Labels:
+    label_set = _destination_labels.get(url)
+    if label_set is None:
+        endpoint = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
+        label_set = metrics.labels(destination=urlsplit(url).netloc, endpoint=endpoint)
+        _destination_labels[url] = label_set
+    return label_set
+
+async def _after_bracket(ticker: str):
+    if _in_bracket.get():
+        return
+    task = _bracket_tasks.get(ticker)
+    if task is not None and not task.done():
+        logger.info("Waiting for in-flight %s bracket before sending", ticker)
+        await asyncio.wait([task])
+
+async def _post_with_retry(url: str, body: bytes, result: DispatchResult, ticker: str = "", leg: str = "entry") -> DispatchResult:
+    operation_name = result.operation_name
+    key = order_ledger.leg_key(url, operation_name)
+    result.idempotency_key = key
+    acknowledged = order_ledger.acknowledged(key)
+    if acknowledged is not None:
+        order_ledger.record_skipped(acknowledged)
+        result.status = "duplicate"
+        result.status_code = acknowledged.status_code
+        return result
+    headers = {**JSON_HEADERS, config.IDEMPOTENCY_HEADER: key}
+    destination = _metric_labels(url)
+    client = _get_client(url)
+    breaker = retry_policy.get_breaker(url)
+    started = time.perf_counter()
+    retry_policy.retry_budget.record_request()
     try:
-        ticker = payload.get("ticker", "Unknown")
-        action = payload.get("action", "Unknown")
-        price = payload.get("price", "")
-        order_type = payload.get("orderType", "market")
-        
-        qty = quantity if quantity is not None else payload.get("quantity", "Unknown")
-        
-        title = f"Order Placed: {ticker} {action.upper()}"
-        
-        message_parts = [
-            f"Ticker: {ticker}",
-            f"Action: {action.upper()}",
-            f"Quantity: {qty}",
-        ]
+        for attempt in range(config.WEBHOOK_MAX_ATTEMPTS):
+            if not breaker.allow_request():
+                result.status = "circuit_open"
+                result.error = f"circuit open for {url}"
+                logger.warning("%s not sent - circuit open for %s", operation_name, url)
+                break
         
-        if price:
-            message_parts.append(f"Price: {price}")
-        
-        if order_type and order_type != "market":
-            message_parts.append(f"Order Type: {order_type}")
-        
-        if additional_context:
-            source = additional_context.get("source")
-            if source:
-                message_parts.append(f"Source: {source}")
-            
-            direction = additional_context.get("direction")
-            if direction:
-                message_parts.append(f"Direction: {direction}")
+            result.attempts = attempt + 1
+            order_ledger.record_attempt(key, url, operation_name, ticker, leg, result.attempts)
+            metrics.inc("webhook_attempts_total", destination)
+            if attempt:
+                metrics.inc("webhook_retries_total", destination)
+            try:
+                webhook_response = await client.post(url, content=body, headers=headers)
+                result.status_code = webhook_response.status_code
+                webhook_response.raise_for_status()
+                breaker.record_success()
+                result.status = "success"
+                result.error = None
+                break
+            except Exception as e:
+                result.error = str(e)
+                retryable = retry_policy.is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                logger.error("Error submitting %s to %s (attempt %s): %s", operation_name, url, attempt + 1, e)
             
-            letter = additional_context.get("letter")
-            if letter:
-                message_parts.append(f"Letter: {letter}")
-            
-            score = additional_context.get("score")
-            if score:
-                message_parts.append(f"Score: {score}")
-            
-            level = additional_context.get("level")
-            if level:
-                message_parts.append(f"Level: {level}")
-            
-            interval = additional_context.get("interval")
-            if interval:
-                message_parts.append(f"Interval: {interval}")
-            
-            stop_value = additional_context.get("stop_value")
-            if stop_value:
-                message_parts.append(f"Stop: {stop_value}")
-        
-        message_parts.append(f"Operation: {operation_name}")
-        
-        message = "\n".join(message_parts)
-        
-        ntfy_url = "https://ntfy.sh/fcpauldiaz_notifications"
-        headers = {
-            "Title": title,
-            "Priority": "default",
-            "Tags": "chart_with_upwards_trend"
-        }
-        
-        requests.post(ntfy_url, data=message.encode("utf-8"), headers=headers, timeout=5)
-        print(f"ntfy notification sent: {title}")
-    except Exception as e:
-        print(f"Error sending ntfy notification: {e}")
+                if not retryable:
+                    result.status = "rejected"
+                    logger.warning("%s rejected by %s, not retrying", operation_name, url)
+                    break
+                if attempt + 1 >= config.WEBHOOK_MAX_ATTEMPTS:
+                    result.status = "failed"
+                    logger.warning("%s failed after all retries for %s", operation_name, url)
+                    break
+                if not retry_policy.retry_budget.try_spend():
+                    result.status = "failed"
+                    logger.warning("%s retry budget exhausted, giving up on %s", operation_name, url)
+                    break
+                await asyncio.sleep(retry_policy.backoff_delay(attempt))
+    except asyncio.CancelledError:
+        result.status = "cancelled"
+        result.error = "cancelled before the broker answered"
+        if result.attempts:
+            order_ledger.record_outcome(key, result.status, result.status_code, result.error)
+        raise
+    if result.attempts:
+        order_ledger.record_outcome(key, result.status, result.status_code, result.error)
+    if result.status != "success":
+        metrics.inc("webhook_failures_total", destination + (("outcome", result.status),))
+    result.latency_ms = (time.perf_counter() - started) * 1000
+    return result
 
-def send_webhook(
-    payload: Dict,
+async def _send_webhook(
+    payload: Mapping,
     url: str,
     quantity: Optional[int] = None,
     operation_name: str = "webhook",
     is_entry_trade: bool = False,
-    additional_context: Optional[Dict] = None
-):
+    additional_context: Optional[Dict] = None,
+    result: Optional[DispatchResult] = None
+) -> DispatchResult:
+    if result is None:
+        result = DispatchResult(url=url, operation_name=operation_name)
     if not url:
-        print(f"No URL provided for {operation_name}")
-        return
+        logger.info("No URL provided for %s", operation_name)
+        result.status = "skipped"
+        return result
     
-    webhook_payload = payload.copy()
-    if quantity is not None:
-        webhook_payload["quantity"] = quantity
-    elif "quantity" not in webhook_payload:
-        webhook_payload["quantity"] = config.GLOBAL_QUANTITY
+    webhook_payload, body = order_templates.prepare(payload, quantity)
+    await _after_bracket(webhook_payload.get("ticker", ""))
+    leg = _leg_kind(webhook_payload)
+    await _post_with_retry(url, body, result, webhook_payload.get("ticker", ""), leg)
+    if result.status == "duplicate":
+        return result
+    latency.record_leg(leg, result.latency_ms / 1000)
+    csv_logger.log_trade(
+        webhook_payload.get("ticker", ""),
+        webhook_payload.get("action", ""),
+        webhook_payload.get("quantity"),
+        webhook_payload.get("price") or webhook_payload.get("stopPrice") or webhook_payload.get("signalPrice"),
+        webhook_payload.get("orderType"),
+        operation_name,
+        result.status
+    )
+    if result.ok:
+        qty_info = f" (qty: {webhook_payload.get('quantity')})"
+        logger.info("%s submitted successfully to %s%s (attempt %s)", operation_name, url, qty_info, result.attempts)
+        if is_entry_trade:
+            send_ntfy_notification(webhook_payload, quantity, operation_name, additional_context)
+    return result
+
+async def _send_cancel_webhook(ticker: str, url: str):
+    result = DispatchResult(url=url, operation_name="Cancel webhook")
+    if not url:
+        logger.info("No URL provided for cancel webhook")
+        result.status = "skipped"
+        return result
     
-    for attempt in range(5):
-        try:
-            webhook_response = requests.post(url, json=webhook_payload)
-            webhook_response.raise_for_status()
-            qty_info = f" (qty: {webhook_payload.get('quantity')})"
-            print(f"{operation_name} submitted successfully to {url}{qty_info} (attempt {attempt + 1})")
-            if is_entry_trade:
-                send_ntfy_notification(webhook_payload, quantity, operation_name, additional_context)
-            break
-        except Exception as e:
-            print(f"Error submitting {operation_name} to {url} (attempt {attempt + 1}): {e}")
-            if attempt < 4:
-                time.sleep(1)
-            else:
-                print(f"{operation_name} failed after all retries for {url}")
+    await _after_bracket(ticker)
+    await _post_with_retry(url, order_templates.cancel_body(ticker), result, ticker, "cancel")
+    if result.status == "duplicate":
+        return result
+    latency.record_leg("cancel", result.latency_ms / 1000)
+    csv_logger.log_trade(ticker, "cancel", 0, source=result.operation_name, result=result.status)
+    if result.ok:
+        logger.info("Cancel webhook sent successfully for %s to %s (attempt %s)", ticker, url, result.attempts)
+    return result
+
+def send_webhook(
+    payload: Mapping,
+    url: str,
+    quantity: Optional[int] = None,
+    operation_name: str = "webhook",
+    is_entry_trade: bool = False,
+    additional_context: Optional[Dict] = None
+):
+    return _run(_send_webhook(payload, url, quantity, operation_name, is_entry_trade, additional_context))
+
+async def send_webhook_async(
+    payload: Mapping,
+    url: str,
+    quantity: Optional[int] = None,
+    operation_name: str = "webhook",
+    is_entry_trade: bool = False,
+    additional_context: Optional[Dict] = None
+):
+    return await asyncio.wrap_future(submit(_send_webhook(payload, url, quantity, operation_name, is_entry_trade, additional_context)))
 
 def send_cancel_webhook(ticker: str, url: str):
-    if not url:
-        print(f"No URL provided for cancel webhook")
-        return
+    return _run(_send_cancel_webhook(ticker, url))
+
+async def send_cancel_webhook_async(ticker: str, url: str):
+    return await asyncio.wrap_future(submit(_send_cancel_webhook(ticker, url)))
+
+async def _fan_out(
+    payload: Mapping,
+    urls: List[str],
+    operation_name: str,
+    quantity: Optional[int],
+    is_entry_trade: bool,
+    additional_context: Optional[Dict],
+    deadline: Optional[float]
+) -> List[DispatchResult]:
+    started = time.perf_counter()
+    results = [DispatchResult(url=url, operation_name=operation_name) for url in urls]
+    tasks = [
+        asyncio.ensure_future(_send_webhook(payload, url, quantity, operation_name, is_entry_trade, additional_context, result))
+        for url, result in zip(urls, results)
+    ]
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
     
-    cancel_payload = {
-        "ticker": ticker,
-        "action": "cancel"
-    }
+    for result, task in zip(results, tasks):
+        if task in pending:
+            result.status = "timeout"
+            result.latency_ms = (time.perf_counter() - started) * 1000
+            result.error = f"deadline of {deadline}s exceeded"
+            logger.warning("%s to %s did not complete within %ss deadline", operation_name, result.url, deadline)
+        elif task.exception() is not None:
+            result.status = "failed"
+            result.error = str(task.exception())
+    return results
+
+async def _send_to_urls(
+    payload: Mapping,
+    urls: Union[List[str], str],
+    operation_name: str,
+    quantity: Optional[int],
+    is_entry_trade: bool,
+    additional_context: Optional[Dict],
+    concurrent: bool,
+    deadline: Optional[float]
+) -> List[DispatchResult]:
+    if isinstance(urls, str):
+        urls = [urls]
     
-    for attempt in range(5):
-        try:
-            webhook_response = requests.post(url, json=cancel_payload)
-            webhook_response.raise_for_status()
-            print(f"Cancel webhook sent successfully for {ticker} to {url} (attempt {attempt + 1})")
-            break
-        except Exception as e:
-            print(f"Error sending cancel webhook for {ticker} to {url} (attempt {attempt + 1}): {e}")
-            if attempt < 4:
-                time.sleep(1)
-            else:
-                print(f"Cancel webhook failed after all retries for {ticker} to {url}")
+    if not urls:
+        logger.info("No URLs provided for %s", operation_name)
+        return []
+    
+    if concurrent:
+        return await _fan_out(payload, urls, operation_name, quantity, is_entry_trade, additional_context, deadline)
+    
+    return [
+        await _send_webhook(payload, url, quantity, operation_name, is_entry_trade, additional_context)
+        for url in urls
+    ]
 
 def send_webhook_to_multiple_urls(
-    payload: Dict,
+    payload: Mapping,
     urls: Union[List[str], str],
     operation_name: str = "webhook",
     quantity: Optional[int] = None,
     is_entry_trade: bool = False,
+    additional_context: Optional[Dict] = None,
+    concurrent: bool = True,
+    deadline: Optional[float] = config.WEBHOOK_FANOUT_DEADLINE
+) -> List[DispatchResult]:
+    return _run(_send_to_urls(payload, urls, operation_name, quantity, is_entry_trade, additional_context, concurrent, deadline))
+
+async def send_webhook_to_multiple_urls_async(
+    payload: Mapping,
+    urls: Union[List[str], str],
+    operation_name: str = "webhook",
+    quantity: Optional[int] = None,
+    is_entry_trade: bool = False,
+    additional_context: Optional[Dict] = None,
+    concurrent: bool = True,
+    deadline: Optional[float] = config.WEBHOOK_FANOUT_DEADLINE
+) -> List[DispatchResult]:
+    return await asyncio.wrap_future(submit(
+        _send_to_urls(payload, urls, operation_name, quantity, is_entry_trade, additional_context, concurrent, deadline)
+    ))
+
+@dataclass
+class OrderLeg:
+    payload: Dict
+    operation_name: str
+    quantity: Optional[int] = None
+    is_entry_trade: bool = False
     additional_context: Optional[Dict] = None
-):
+
+@dataclass
+class Bracket:
+    bracket_id: str
+    ticker: str
+    urls: List[str]
+    status: str = "pending"
+    created_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+    results: List[DispatchResult] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bracket_id": self.bracket_id,
+            "ticker": self.ticker,
+            "status": self.status,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "results": [result.to_dict() for result in self.results],
+        }
+
+_brackets: "OrderedDict[str, Bracket]" = OrderedDict()
+_brackets_lock = threading.Lock()
+
+async def _run_bracket_leg_chain(bracket: Bracket, url: str, cancel: bool, entry: OrderLeg, exits: List[OrderLeg]):
+    if cancel:
+        bracket.results.append(await _send_cancel_webhook(bracket.ticker, url))
+    
+    entry_result = await _send_webhook(entry.payload, url, entry.quantity, entry.operation_name, entry.is_entry_trade, entry.additional_context)
+    bracket.results.append(entry_result)
+    if not entry_result.ok:
+        for leg in exits:
+            bracket.results.append(DispatchResult(url=url, operation_name=leg.operation_name, status="skipped", error="entry not acknowledged"))
+        logger.warning("Bracket %s: entry not acknowledged by %s, skipping %s exit leg(s)", bracket.bracket_id, url, len(exits))
+        return False
+    
+    exit_results = await asyncio.gather(*[
+        _send_webhook(leg.payload, url, leg.quantity, leg.operation_name, leg.is_entry_trade, leg.additional_context)
+        for leg in exits
+    ])
+    bracket.results.extend(exit_results)
+    return all(result.ok for result in exit_results)
+
+async def _run_bracket(bracket: Bracket, cancel: bool, entry: OrderLeg, exits: List[OrderLeg]) -> Bracket:
+    task = asyncio.current_task()
+    previous = _bracket_tasks.get(bracket.ticker)
+    _bracket_tasks[bracket.ticker] = task
+    try:
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        _in_bracket.set(True)
+        return await _submit_bracket_legs(bracket, cancel, entry, exits)
+    finally:
+        if _bracket_tasks.get(bracket.ticker) is task:
+            del _bracket_tasks[bracket.ticker]
+
+async def _submit_bracket_legs(bracket: Bracket, cancel: bool, entry: OrderLeg, exits: List[OrderLeg]) -> Bracket:
+    bracket.status = "submitting"
+    try:
+        outcomes = await asyncio.gather(*[
+            _run_bracket_leg_chain(bracket, url, cancel, entry, exits)
+            for url in bracket.urls
+        ])
+        bracket.status = "completed" if all(outcomes) else "failed"
+    except Exception as e:
+        logger.error("Error submitting bracket %s: %s", bracket.bracket_id, e)
+        bracket.status = "failed"
+    bracket.completed_at = time.time()
+    logger.info("Bracket %s for %s %s in %.1fms", bracket.bracket_id, bracket.ticker, bracket.status, (bracket.completed_at - bracket.created_at) * 1000)
+    return bracket
+
+def _start_bracket(
+    ticker: str,
+    urls: Union[List[str], str],
+    entry: OrderLeg,
+    exits: Optional[List[OrderLeg]],
+    cancel: bool
+) -> Tuple[Bracket, Optional[Future]]:
     if isinstance(urls, str):
         urls = [urls]
+    urls = [url for url in urls if url]
+    
+    bracket = Bracket(bracket_id=uuid.uuid4().hex, ticker=ticker, urls=urls)
+    with _brackets_lock:
+        _brackets[bracket.bracket_id] = bracket
+        while len(_brackets) > MAX_TRACKED_BRACKETS:
+            _brackets.popitem(last=False)
     
     if not urls:
-        print(f"No URLs provided for {operation_name}")
-        return
+        logger.info("No URLs provided for bracket %s", bracket.bracket_id)
+        bracket.status = "skipped"
+        return bracket, None
     
-    for url in urls:
-        send_webhook(payload, url, quantity, operation_name, is_entry_trade, additional_context)
+    return bracket, submit(_run_bracket(bracket, cancel, entry, exits or []))
+
+@contextmanager
+def awaiting_brackets() -> Iterator[None]:
+    token = _await_brackets.set(True)
+    try:
+        yield
+    finally:
+        _await_brackets.reset(token)
+
+def submit_bracket(
+    ticker: str,
+    urls: Union[List[str], str],
+    entry: OrderLeg,
+    exits: Optional[List[OrderLeg]] = None,
+    cancel: bool = True,
+    wait: bool = False
+) -> Bracket:
+    bracket, future = _start_bracket(ticker, urls, entry, exits, cancel)
+    if (wait or _await_brackets.get()) and future is not None:
+        future.result()
+    return bracket
+
+async def submit_bracket_async(
+    ticker: str,
+    urls: Union[List[str], str],
+    entry: OrderLeg,
+    exits: Optional[List[OrderLeg]] = None,
+    cancel: bool = True,
+    wait: bool = False
+) -> Bracket:
+    bracket, future = _start_bracket(ticker, urls, entry, exits, cancel)
+    if (wait or _await_brackets.get()) and future is not None:
+        await asyncio.wrap_future(future)
+    return bracket
+
+def get_bracket(bracket_id: str) -> Optional[Bracket]:
+    with _brackets_lock:
+        return _brackets.get(bracket_id)
+
+def _collect_metrics():
+    circuit_samples = []
+    for url, state in retry_policy.get_breaker_states().items():
+        label_set = _metric_labels(url)
+        circuit_samples.append(("webhook_circuit_open", label_set, 0 if state["state"] == retry_policy.CircuitBreaker.CLOSED else 1))
+    yield "webhook_circuit_open", "gauge", "Whether the circuit breaker for a destination is open or half-open", circuit_samples
+    yield "webhook_retry_budget_tokens", "gauge", "Retry tokens currently available", [
+        ("webhook_retry_budget_tokens", (), retry_policy.retry_budget.tokens)
+    ]
+    yield "webhook_retry_budget_rejected_total", "counter", "Retries refused because the retry budget was exhausted", [
+        ("webhook_retry_budget_rejected_total", (), retry_policy.retry_budget.rejected)
+    ]
 
+metrics.register_collector(_collect_metrics)
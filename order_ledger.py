@@ -0,0 +1,323 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PRUNE_BATCH = 1000
+
+metrics.describe("order_ledger_skipped_total", "counter", "Order legs not sent because the ledger already holds a broker acknowledgement for their idempotency key")
+
+@dataclass
+class LedgerEntry:
+    key: str
+    url: str
+    operation: str
+    ticker: str
+    leg: str
+    first_sent_at: float
+    status: str = "sending"
+    attempts: int = 0
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    completed_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "url": self.url,
+            "operation": self.operation,
+            "ticker": self.ticker,
+            "leg": self.leg,
+            "first_sent_at": self.first_sent_at,
+            "status": self.status,
+            "attempts": self.attempts,
+            "status_code": self.status_code,
+            "error": self.error,
+            "completed_at": self.completed_at,
+        }
+
+class Scope:
+    __slots__ = ("scope_id", "_counts")
+
+    def __init__(self, scope_id: str):
+        self.scope_id = scope_id
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def next_key(self, url: str, operation: str) -> str:
+        occurrence = self._counts.get((url, operation), 0)
+        self._counts[(url, operation)] = occurrence + 1
+        seed = f"{self.scope_id}|{url}|{operation}|{occurrence}"
+        return hashlib.blake2b(seed.encode(), digest_size=16).hexdigest()
+
+_scope: ContextVar[Optional[Scope]] = ContextVar("order_ledger_scope", default=None)
+
+_lock = threading.Lock()
+_entries: Dict[str, LedgerEntry] = {}
+_times: List[float] = []
+_keys: List[str] = []
+_signals: Dict[str, Tuple[str, str, float]] = {}
+_file = None
+_loaded = False
+
+_queue: List[Dict[str, Any]] = []
+_cond = threading.Condition()
+_writer: Optional[threading.Thread] = None
+_writing = False
+
+def current_scope() -> Optional[Scope]:
+    return _scope.get()
+
+def set_scope(scope: Optional[Scope]):
+    _scope.set(scope)
+
+@contextmanager
+def scope(scope_id: str) -> Iterator[Scope]:
+    current = Scope(scope_id)
+    token = _scope.set(current)
+    try:
+        yield current
+    finally:
+        _scope.reset(token)
+
+def leg_key(url: str, operation: str) -> str:
+    current = _scope.get()
+    if current is None:
+        return uuid.uuid4().hex
+    return current.next_key(url, operation)
+
+def _apply(record: Dict[str, Any]):
+    key = record["key"]
+    if record["event"] == "signal":
+        _signals[key] = (record["fingerprint"], record["scope"], record["at"])
+        return
+    entry = _entries.get(key)
+    if record["event"] == "attempt":
+        if entry is None:
+            at = record["at"]
+            if _times and at < _times[-1]:
+                at = _times[-1]
+            entry = LedgerEntry(key, record["url"], record["operation"], record["ticker"], record["leg"], at)
+            _entries[key] = entry
+            _times.append(at)
+            _keys.append(key)
+        entry.attempts = record["attempt"]
+        entry.status = "sending"
+    elif entry is not None:
+        entry.status = record["status"]
+        entry.status_code = record.get("status_code")
+        entry.error = record.get("error")
+        entry.completed_at = record["at"]
+
+def _prune(now: float, batch: int = PRUNE_BATCH):
+    index = bisect.bisect_left(_times, now - config.LEDGER_RETENTION)
+    if index < batch:
+        return
+    for key in _keys[:index]:
+        _entries.pop(key, None)
+    del _times[:index]
+    del _keys[:index]
+
+def _write(records: List[Dict[str, Any]]):
+    global _file
+    if _file is None:
+        _file = open(config.LEDGER_FILE, 'a')
+    _file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+    _file.flush()
+
+def _run_writer():
+    global _queue, _writing
+    while True:
+        with _cond:
+            while not _queue:
+                _cond.wait()
+            batch = _queue
+            _queue = []
+            _writing = True
+        try:
+            _write(batch)
+        except Exception as e:
+            logger.error("Error writing order ledger: %s", e)
+        with _cond:
+            _writing = False
+            _cond.notify_all()
+
+def _schedule(record: Dict[str, Any]):
+    global _writer
+    with _cond:
+        _queue.append(record)
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name="ledger-writer", daemon=True)
+            _writer.start()
+        _cond.notify_all()
+
+def flush(timeout: float = 5.0) -> bool:
+    with _cond:
+        return _cond.wait_for(lambda: not _queue and not _writing, timeout)
+
+def _snapshot_records(entry: LedgerEntry) -> List[Dict[str, Any]]:
+    records = [{
+        "key": entry.key,
+        "event": "attempt",
+        "at": entry.first_sent_at,
+        "attempt": entry.attempts,
+        "url": entry.url,
+        "operation": entry.operation,
+        "ticker": entry.ticker,
+        "leg": entry.leg,
+    }]
+    if entry.completed_at is not None:
+        records.append({
+            "key": entry.key,
+            "event": "outcome",
+            "at": entry.completed_at,
+            "status": entry.status,
+            "status_code": entry.status_code,
+            "error": entry.error,
+        })
+    return records
+
+def load():
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        path = config.LEDGER_FILE
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    _apply(json.loads(line))
+                except Exception as e:
+                    logger.warning("Skipping unreadable order ledger line %s in %s: %s", number, path, e)
+        now = time.time()
+        _prune(now, 0)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for key, (fingerprint, scope_id, at) in _signals.items():
+                if now - at < config.LEDGER_DEDUPE_WINDOW:
+                    f.write(json.dumps({"key": key, "event": "signal", "at": at, "fingerprint": fingerprint, "scope": scope_id}, separators=(",", ":")) + "\n")
+            for key in _keys:
+                for record in _snapshot_records(_entries[key]):
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            if config.STATE_FSYNC:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        unresolved = sum(1 for entry in _entries.values() if entry.status == "sending")
+        if unresolved:
+            logger.warning("Order ledger has %s leg(s) with no recorded outcome; retries will reuse their idempotency keys", unresolved)
+        logger.info("Order ledger loaded %s leg(s) from %s", len(_entries), path)
+
+def signal_id(source: str, payload: Any) -> str:
+    if not _loaded:
+        load()
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    fingerprint = hashlib.blake2b(f"{source}|{canonical}".encode(), digest_size=16).hexdigest()
+    now = time.time()
+    with _lock:
+        known = _signals.get(source)
+        if known is not None and known[0] == fingerprint and now - known[2] < config.LEDGER_DEDUPE_WINDOW:
+            return known[1]
+        record = {"key": source, "event": "signal", "at": now, "fingerprint": fingerprint, "scope": f"{fingerprint}:{now!r}"}
+        _apply(record)
+        _schedule(record)
+    return record["scope"]
+
+def acknowledged(key: str) -> Optional[LedgerEntry]:
+    if not _loaded:
+        load()
+    entry = _entries.get(key)
+    if entry is not None and entry.status == "success":
+        return entry
+    return None
+
+def record_attempt(key: str, url: str, operation: str, ticker: str, leg: str, attempt: int):
+    record = {
+        "key": key,
+        "event": "attempt",
+        "at": time.time(),
+        "attempt": attempt,
+        "url": url,
+        "operation": operation,
+        "ticker": ticker,
+        "leg": leg,
+    }
+    with _lock:
+        _apply(record)
+        _schedule(record)
+
+def record_outcome(key: str, status: str, status_code: Optional[int] = None, error: Optional[str] = None):
+    now = time.time()
+    record = {
+        "key": key,
+        "event": "outcome",
+        "at": now,
+        "status": status,
+        "status_code": status_code,
+        "error": error,
+    }
+    with _lock:
+        _apply(record)
+        _schedule(record)
+        _prune(now)
+
+def record_skipped(entry: LedgerEntry):
+    metrics.inc("order_ledger_skipped_total", metrics.labels(leg=entry.leg))
+    logger.warning("%s to %s already acknowledged (key %s), not sending again", entry.operation, entry.url, entry.key)
+
+def get(key: str) -> Optional[LedgerEntry]:
+    with _lock:
+        return _entries.get(key)
+
+def recent(seconds: float) -> List[Dict[str, Any]]:
+    cutoff = time.time() - seconds
+    with _lock:
+        index = bisect.bisect_left(_times, cutoff)
+        entries = [_entries[key] for key in _keys[index:]]
+    return [entry.to_dict() for entry in entries]
+
+def close():
+    global _file
+    if not flush():
+        logger.warning("Order ledger writer did not drain before close")
+    with _cond:
+        if _file is None:
+            return
+        try:
+            if config.STATE_FSYNC:
+                os.fsync(_file.fileno())
+        finally:
+            _file.close()
+            _file = None
+
+def _collect_metrics():
+    with _lock:
+        counts: Dict[str, int] = {}
+        for entry in _entries.values():
+            counts[entry.status] = counts.get(entry.status, 0) + 1
+    with _cond:
+        pending = len(_queue)
+    yield "order_ledger_entries", "gauge", "Order legs held in the ledger, by last known status", [
+        ("order_ledger_entries", metrics.labels(status=status), count) for status, count in counts.items()
+    ]
+    yield "order_ledger_pending_writes", "gauge", "Ledger records waiting for the writer thread", [
+        ("order_ledger_pending_writes", (), pending)
+    ]
+
+metrics.register_collector(_collect_metrics)
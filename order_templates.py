@@ -0,0 +1,212 @@
+import json
+from collections.abc import Mapping
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import config
+
+class Slot:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+PRICE = Slot("price")
+STOP_PRICE = Slot("stopPrice")
+SIGNAL_PRICE = Slot("signalPrice")
+TIME = Slot("time")
+QUANTITY = Slot("quantity")
+TAKE_PROFIT_AMOUNT = Slot("takeProfitAmount")
+STOP_LOSS_AMOUNT = Slot("stopLossAmount")
+
+def _marker(name: str) -> str:
+    return f"\x00{name}\x00"
+
+def encode_value(value: Any) -> bytes:
+    kind = value.__class__
+    if kind is str:
+        return encode_basestring_ascii(value).encode()
+    if kind is int:
+        return str(value).encode()
+    if kind is float and value - value == 0:
+        return float.__repr__(value).encode()
+    return json.dumps(value).encode()
+
+class OrderTemplate:
+    def __init__(self, fields: Dict[str, Any], quantity: bool = True):
+        if quantity and "quantity" not in fields:
+            fields = {**fields, "quantity": QUANTITY}
+        self.fields = fields
+        names: List[str] = []
+
+        def skeleton(value: Any) -> Any:
+            if isinstance(value, Slot):
+                names.append(value.name)
+                return _marker(value.name)
+            if isinstance(value, dict):
+                return {key: skeleton(item) for key, item in value.items()}
+            return value
+
+        text = json.dumps(skeleton(fields))
+        segments = []
+        for name in names:
+            head, text = text.split(json.dumps(_marker(name)), 1)
+            segments.append(head.encode())
+        self.slots: Tuple[str, ...] = tuple(names)
+        self._parts: Tuple[Tuple[bytes, str], ...] = tuple(zip(segments, names))
+        self._tail = text.encode()
+
+    def render(self, **values: Any) -> "Order":
+        return Order(self, values)
+
+    def encode(self, values: Dict[str, Any]) -> bytes:
+        parts = []
+        for segment, name in self._parts:
+            parts.append(segment)
+            parts.append(encode_value(values.get(name)))
+        parts.append(self._tail)
+        return b"".join(parts)
+
+class Order(Mapping):
+    __slots__ = ("template", "values")
+
+    def __init__(self, template: OrderTemplate, values: Dict[str, Any]):
+        self.template = template
+        self.values = values
+
+    def with_quantity(self, quantity: Optional[int]) -> "Order":
+        if quantity is None:
+            if self.values.get("quantity") is not None or "quantity" not in self.template.slots:
+                return self
+            quantity = config.GLOBAL_QUANTITY
+        return Order(self.template, {**self.values, "quantity": quantity})
+
+    def encode(self) -> bytes:
+        return self.template.encode(self.values)
+
+    def _resolve(self, value: Any) -> Any:
+        if isinstance(value, Slot):
+            return self.values.get(value.name)
+        if isinstance(value, dict):
+            return {key: self._resolve(item) for key, item in value.items()}
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._resolve(self.template.fields[key])
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, value in self.template.fields.items():
+            if not isinstance(value, Slot) or self.values.get(value.name) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Order({dict(self)!r})"
+
+def prepare(payload: Mapping, quantity: Optional[int]) -> Tuple[Mapping, bytes]:
+    if isinstance(payload, Order):
+        order = payload.with_quantity(quantity)
+        return order, order.encode()
+    webhook_payload = dict(payload)
+    if quantity is not None:
+        webhook_payload["quantity"] = quantity
+    elif "quantity" not in webhook_payload:
+        webhook_payload["quantity"] = config.GLOBAL_QUANTITY
+    return webhook_payload, json.dumps(webhook_payload).encode()
+
+_cancel_bodies: Dict[str, bytes] = {}
+
+def cancel_body(ticker: str) -> bytes:
+    body = _cancel_bodies.get(ticker)
+    if body is None:
+        body = OrderTemplate({"ticker": ticker, "action": "cancel"}, quantity=False).render().encode()
+        _cancel_bodies[ticker] = body
+    return body
+
+def _sides(build: Callable[[str], Dict[str, Any]]) -> Dict[str, OrderTemplate]:
+    return {action: OrderTemplate(build(action)) for action in ("buy", "sell")}
+
+MES_MARKET = _sides(lambda action: {
+    "ticker": config.TICKER_SYMBOL,
+    "price": PRICE,
+    "action": action,
+    "orderType": "market"
+})
+MES_EXIT_AT = OrderTemplate({
+    "ticker": config.TICKER_SYMBOL,
+    "price": PRICE,
+    "action": "exit",
+    "orderType": "market"
+})
+MES_EXIT = OrderTemplate({
+    "ticker": config.TICKER_SYMBOL,
+    "action": "exit",
+    "orderType": "market",
+})
+MES_STOP = _sides(lambda action: {
+    "ticker": config.TICKER_SYMBOL,
+    "action": action,
+    "time": TIME,
+    "orderType": "stop",
+    "stopPrice": STOP_PRICE,
+    "quantityType": "fixed_quantity"
+})
+
+def market_entry(ticker: str) -> Dict[str, OrderTemplate]:
+    return _sides(lambda action: {
+        "ticker": ticker,
+        "action": action,
+        "price": PRICE,
+        "quantity": QUANTITY,
+        "orderType": "market"
+    })
+
+def limit_target(ticker: str) -> Dict[str, OrderTemplate]:
+    return _sides(lambda action: {
+        "ticker": ticker,
+        "action": action,
+        "price": PRICE,
+        "orderType": "limit",
+        "quantity": QUANTITY
+    })
+
+def timed_stop(ticker: str) -> Dict[str, OrderTemplate]:
+    return _sides(lambda action: {
+        "ticker": ticker,
+        "action": action,
+        "time": TIME,
+        "orderType": "stop",
+        "stopPrice": STOP_PRICE,
+        "quantityType": "fixed_quantity",
+        "quantity": QUANTITY
+    })
+
+def reduce(ticker: str) -> Dict[str, OrderTemplate]:
+    return _sides(lambda action: {
+        "ticker": ticker,
+        "action": action,
+        "quantity": QUANTITY
+    })
+
+def flatten(ticker: str) -> OrderTemplate:
+    return OrderTemplate({
+        "ticker": ticker,
+        "action": "exit",
+        "cancel": "true"
+    })
+
+def broker_bracket(ticker: str) -> Dict[str, OrderTemplate]:
+    return _sides(lambda action: {
+        "ticker": ticker,
+        "action": action,
+        "orderType": "market",
+        "signalPrice": SIGNAL_PRICE,
+        "quantity": QUANTITY,
+        "takeProfit": {"amount": TAKE_PROFIT_AMOUNT},
+        "stopLoss": {"type": "stop", "amount": STOP_LOSS_AMOUNT},
+    })
@@ -1,129 +1,240 @@
-import os
-import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import logging
+import copy
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, List, Tuple
 import config
+import instrument_locks
+import latency
+import state_store
 
-def save_open_order(order_info: Dict[str, Any]):
+logger = logging.getLogger(__name__)
+
+MES = "mes"
+GOLD = "gold"
+NQ = "nq"
+
+_positions: Dict[str, Dict[str, Any]] = {}
+_expires_at: Dict[str, float] = {}
+_deadlines: List[Tuple[float, str]] = []
+_lock = threading.RLock()
+_wakeup = threading.Condition(_lock)
+_loaded = False
+_clock: Callable[[], float] = time.monotonic
+_expiry_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+_expiry_thread: Optional[threading.Thread] = None
+_stopping = False
+
+_slots: Dict[str, Tuple[str, str]] = {
+    MES: (config.ORDER_FILE, config.TICKER_SYMBOL),
+    GOLD: (config.GOLD_ORDER_FILE, config.GOLD_TICKER),
+    NQ: (config.NQ_ORDER_FILE, config.NQ_TICKER),
+}
+
+def _state_file(slot: str) -> str:
+    return _slots[slot][0]
+
+def _ticker(slot: str) -> str:
+    return _slots[slot][1]
+
+def register_slot(slot: str, state_file: str, ticker: str):
+    with _lock:
+        if _slots.get(slot) == (state_file, ticker):
+            return
+        _slots[slot] = (state_file, ticker)
+        if _loaded:
+            _load_slot(slot, datetime.now())
+
+def _schedule(slot: str, deadline: float):
+    _expires_at[slot] = deadline
+    heapq.heappush(_deadlines, (deadline, slot))
+    _wakeup.notify()
+
+def load():
+    global _loaded
+    with _lock:
+        _positions.clear()
+        _expires_at.clear()
+        _deadlines.clear()
+        now = datetime.now()
+        for slot in _slots:
+            _load_slot(slot, now)
+        _loaded = True
+
+def _load_slot(slot: str, now: datetime):
+    try:
+        order_data = state_store.read(_state_file(slot))
+    except Exception as e:
+        logger.warning("Could not load %s position: %s", slot, e)
+        return
+    if order_data is None:
+        return
+    try:
+        remaining = config.ORDER_EXPIRY_SECONDS - (now - datetime.fromisoformat(order_data["timestamp"])).total_seconds()
+        _positions[slot] = order_data
+        _schedule(slot, _clock() + remaining)
+    except Exception as e:
+        logger.warning("Ignoring invalid %s position snapshot: %s", slot, e)
+
+def _ensure_loaded():
+    if not _loaded:
+        load()
+
+def flush(timeout: float = 5.0) -> bool:
+    return state_store.flush(timeout)
+
+def _save(slot: str, order_info: Dict[str, Any]):
+    started = time.perf_counter()
+    now = datetime.now()
     order_data = {
-        "timestamp": datetime.now().isoformat(),
-        "order_info": order_info
+        "timestamp": now.isoformat(),
+        "order_info": copy.deepcopy(order_info)
     }
-    with open(config.ORDER_FILE, 'w') as f:
-        json.dump(order_data, f)
+    with _lock:
+        _ensure_loaded()
+        _positions[slot] = order_data
+        _schedule(slot, _clock() + config.ORDER_EXPIRY_SECONDS)
+        state_store.write(_state_file(slot), order_data)
+    latency.record_stage("persist", time.perf_counter() - started)
+
+def _clear(slot: str):
+    started = time.perf_counter()
+    with _lock:
+        _ensure_loaded()
+        _positions.pop(slot, None)
+        _expires_at.pop(slot, None)
+        state_store.delete(_state_file(slot))
+    latency.record_stage("persist", time.perf_counter() - started)
+
+def _has(slot: str) -> bool:
+    started = time.perf_counter()
+    _ensure_loaded()
+    found = slot in _positions
+    latency.record_stage("state_check", time.perf_counter() - started)
+    return found
+
+def _get(slot: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        if not _has(slot):
+            return None
+        return copy.deepcopy(_positions[slot])
+
+def get_open_slots() -> Dict[str, bool]:
+    return {slot: slot in _positions for slot in list(_slots)}
+
+def save(slot: str, order_info: Dict[str, Any]):
+    _save(slot, order_info)
+
+def has(slot: str) -> bool:
+    return _has(slot)
+
+def clear(slot: str):
+    _clear(slot)
+
+def get(slot: str) -> Optional[Dict[str, Any]]:
+    return _get(slot)
+
+def save_open_order(order_info: Dict[str, Any]):
+    _save(MES, order_info)
 
 def has_open_order() -> bool:
-    if not os.path.exists(config.ORDER_FILE):
-        return False
-    
-    try:
-        with open(config.ORDER_FILE, 'r') as f:
-            order_data = json.load(f)
-        
-        order_timestamp = datetime.fromisoformat(order_data["timestamp"])
-        if datetime.now() - order_timestamp > timedelta(hours=1):
-            clear_open_order()
-            return False
-        
-        return True
-    except:
-        return False
+    return _has(MES)
 
 def clear_open_order():
-    if os.path.exists(config.ORDER_FILE):
-        os.remove(config.ORDER_FILE)
+    _clear(MES)
 
 def get_open_order_info() -> Optional[Dict[str, Any]]:
-    if not has_open_order():
-        return None
-    try:
-        with open(config.ORDER_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return None
+    return _get(MES)
 
 def save_gold_order(order_info: Dict[str, Any]):
-    order_data = {
-        "timestamp": datetime.now().isoformat(),
-        "order_info": order_info
-    }
-    with open(config.GOLD_ORDER_FILE, 'w') as f:
-        json.dump(order_data, f)
+    _save(GOLD, order_info)
 
 def has_gold_order() -> bool:
-    if not os.path.exists(config.GOLD_ORDER_FILE):
-        return False
-    
-    try:
-        with open(config.GOLD_ORDER_FILE, 'r') as f:
-            order_data = json.load(f)
-        
-        order_timestamp = datetime.fromisoformat(order_data["timestamp"])
-        if datetime.now() - order_timestamp > timedelta(hours=1):
-            clear_gold_order()
-            return False
-        
-        return True
-    except:
-        return False
+    return _has(GOLD)
 
 def clear_gold_order():
-    if os.path.exists(config.GOLD_ORDER_FILE):
-        os.remove(config.GOLD_ORDER_FILE)
+    _clear(GOLD)
 
 def get_gold_order_info() -> Optional[Dict[str, Any]]:
-    if not has_gold_order():
-        return None
-    try:
-        with open(config.GOLD_ORDER_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return None
+    return _get(GOLD)
 
 def save_nq_order(order_info: Dict[str, Any]):
-    order_data = {
-        "timestamp": datetime.now().isoformat(),
-        "order_info": order_info
-    }
-    with open(config.NQ_ORDER_FILE, 'w') as f:
-        json.dump(order_data, f)
+    _save(NQ, order_info)
 
 def has_nq_order() -> bool:
-    if not os.path.exists(config.NQ_ORDER_FILE):
-        return False
-    
-    try:
-        with open(config.NQ_ORDER_FILE, 'r') as f:
-            order_data = json.load(f)
-        
-        order_timestamp = datetime.fromisoformat(order_data["timestamp"])
-        if datetime.now() - order_timestamp > timedelta(hours=1):
-            clear_nq_order()
-            return False
-        
-        return True
-    except:
-        return False
+    return _has(NQ)
 
 def clear_nq_order():
-    if os.path.exists(config.NQ_ORDER_FILE):
-        os.remove(config.NQ_ORDER_FILE)
+    _clear(NQ)
 
 def get_nq_order_info() -> Optional[Dict[str, Any]]:
-    if not has_nq_order():
-        return None
-    try:
-        with open(config.NQ_ORDER_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return None
+    return _get(NQ)
 
-def reset_orders_if_expired():
-    if has_open_order():
-        order_info = get_open_order_info()
-        if order_info:
-            order_timestamp = datetime.fromisoformat(order_info["timestamp"])
-            if datetime.now() - order_timestamp > timedelta(hours=1):
-                print("Order expired (1 hour), clearing...")
-                clear_open_order()
+def on_expire(listener: Callable[[str, Dict[str, Any]], None]):
+    _expiry_listeners.append(listener)
+
+def _due(now: float) -> List[Tuple[float, str]]:
+    due = []
+    with _lock:
+        while _deadlines and _deadlines[0][0] <= now:
+            deadline, slot = heapq.heappop(_deadlines)
+            if _expires_at.get(slot) == deadline:
+                due.append((deadline, slot))
+    return due
+
+def _expire(slot: str, deadline: float):
+    with instrument_locks.hold(_ticker(slot)):
+        with _lock:
+            if _expires_at.get(slot) != deadline:
+                return
+            order_data = _positions.get(slot)
+            _clear(slot)
+        logger.info("Order expired (%ss), cleared %s position", config.ORDER_EXPIRY_SECONDS, slot)
+        for listener in _expiry_listeners:
+            try:
+                listener(slot, order_data)
+            except Exception as e:
+                logger.error("Error handling %s position expiry: %s", slot, e)
 
+def expire_due(now: Optional[float] = None) -> int:
+    _ensure_loaded()
+    due = _due(_clock() if now is None else now)
+    for deadline, slot in due:
+        _expire(slot, deadline)
+    return len(due)
+
+def _run_expiry():
+    while True:
+        with _lock:
+            if _stopping:
+                return
+            timeout = _deadlines[0][0] - _clock() if _deadlines else None
+            if timeout is None or timeout > 0:
+                _wakeup.wait(timeout)
+                continue
+        expire_due()
+
+def start_expiry():
+    global _expiry_thread, _stopping
+    with _lock:
+        _ensure_loaded()
+        if _expiry_thread is not None and _expiry_thread.is_alive():
+            return
+        _stopping = False
+        _expiry_thread = threading.Thread(target=_run_expiry, name="position-expiry", daemon=True)
+        _expiry_thread.start()
+
+def stop_expiry(timeout: float = 5.0):
+    global _expiry_thread, _stopping
+    with _lock:
+        _stopping = True
+        _wakeup.notify_all()
+        thread = _expiry_thread
+        _expiry_thread = None
+    if thread is not None:
+        thread.join(timeout)
+
+def reset_orders_if_expired():
+    expire_due()
@@ -0,0 +1,131 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+import httpx
+import config
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, httpx.TransportError):
+        return True
+    return False
+
+def backoff_delay(attempt: int) -> float:
+    ceiling = min(config.WEBHOOK_BACKOFF_MAX, config.WEBHOOK_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, url: str, failure_threshold: int, reset_timeout: float):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit opened for %s after %s consecutive failure(s)", self.url, self.consecutive_failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+class RetryBudget:
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated_at = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.updated_at) * self.min_per_second)
+        self.updated_at = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            self.rejected += 1
+            return False
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+retry_budget = RetryBudget(
+    config.RETRY_BUDGET_RATIO,
+    config.RETRY_BUDGET_MIN_PER_SECOND,
+    config.RETRY_BUDGET_MAX_TOKENS,
+)
+
+def get_breaker(url: str) -> CircuitBreaker:
+    breaker = _breakers.get(url)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(url)
+            if breaker is None:
+                breaker = CircuitBreaker(url, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+                _breakers[url] = breaker
+    return breaker
+
+def get_breaker_states() -> Dict[str, Dict]:
+    with _breakers_lock:
+        return {url: breaker.to_dict() for url, breaker in _breakers.items()}
+
+def reset(url: Optional[str] = None):
+    with _breakers_lock:
+        if url is None:
+            _breakers.clear()
+        else:
+            _breakers.pop(url, None)
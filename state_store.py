@@ -0,0 +1,177 @@
+import logging
+import os
+import json
+import hashlib
+import shutil
+import threading
+import time
+from typing import Any, Dict, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+_pending: Dict[str, Optional[Dict[str, Any]]] = {}
+_cond = threading.Condition()
+_writer: Optional[threading.Thread] = None
+_writing = False
+
+_metrics = {
+    "batches": 0,
+    "writes": 0,
+    "fsyncs": 0,
+    "recoveries": 0,
+}
+
+def _checksum(data: Dict[str, Any]) -> str:
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def _backup_path(path: str) -> str:
+    return f"{path}.bak"
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.tmp"
+
+def _fsync_dir(directory: str):
+    if not config.STATE_FSYNC or not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    _metrics["fsyncs"] += 1
+
+def _keep_backup(path: str):
+    backup_path = _backup_path(path)
+    if os.path.exists(backup_path):
+        os.remove(backup_path)
+    try:
+        os.link(path, backup_path)
+    except OSError:
+        shutil.copyfile(path, backup_path)
+
+def _write_file(path: str, data: Dict[str, Any]):
+    envelope = {"checksum": _checksum(data), **data}
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'w') as f:
+        json.dump(envelope, f)
+        f.flush()
+        if config.STATE_FSYNC:
+            os.fsync(f.fileno())
+            _metrics["fsyncs"] += 1
+    if os.path.exists(path):
+        _keep_backup(path)
+    os.replace(tmp_path, path)
+    _metrics["writes"] += 1
+
+def _delete_file(path: str):
+    for candidate in (path, _backup_path(path), _tmp_path(path)):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+def _load_file(path: str) -> Optional[Dict[str, Any]]:
+    with open(path, 'r') as f:
+        envelope = json.load(f)
+    if not isinstance(envelope, dict):
+        raise ValueError("snapshot is not an object")
+    checksum = envelope.pop("checksum", None)
+    if checksum is not None and checksum != _checksum(envelope):
+        raise ValueError("checksum mismatch")
+    return envelope
+
+def read(path: str) -> Optional[Dict[str, Any]]:
+    tmp_path = _tmp_path(path)
+    if os.path.exists(tmp_path):
+        try:
+            _load_file(tmp_path)
+            os.replace(tmp_path, path)
+            _metrics["recoveries"] += 1
+            logger.warning("Recovered complete state write %s that was not yet renamed", tmp_path)
+        except Exception:
+            logger.warning("Discarding incomplete state write %s", tmp_path)
+            os.remove(tmp_path)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return _load_file(path)
+    except Exception as e:
+        logger.warning("State snapshot %s is unreadable (%s), trying last good snapshot", path, e)
+
+    backup_path = _backup_path(path)
+    if not os.path.exists(backup_path):
+        logger.warning("No last good snapshot for %s", path)
+        return None
+    try:
+        data = _load_file(backup_path)
+    except Exception as e:
+        logger.warning("Last good snapshot %s is unreadable (%s)", backup_path, e)
+        return None
+    _metrics["recoveries"] += 1
+    logger.warning("Recovered %s from last good snapshot", path)
+    os.remove(path)
+    _write_file(path, data)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+    return data
+
+def _run_writer():
+    global _writing
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            _writing = True
+            deadline = time.monotonic() + config.STATE_FSYNC_WINDOW
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _cond.wait(remaining)
+            batch = dict(_pending)
+            _pending.clear()
+
+        for path, data in batch.items():
+            try:
+                if data is None:
+                    _delete_file(path)
+                else:
+                    _write_file(path, data)
+            except Exception as e:
+                logger.error("Error persisting state to %s: %s", path, e)
+        try:
+            for directory in {os.path.dirname(os.path.abspath(path)) for path in batch}:
+                _fsync_dir(directory)
+        except Exception as e:
+            logger.error("Error syncing state directory: %s", e)
+        _metrics["batches"] += 1
+
+        with _cond:
+            _writing = False
+            _cond.notify_all()
+
+def _schedule(path: str, data: Optional[Dict[str, Any]]):
+    global _writer
+    with _cond:
+        _pending[path] = data
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name="state-writer", daemon=True)
+            _writer.start()
+        _cond.notify_all()
+
+def write(path: str, data: Dict[str, Any]):
+    _schedule(path, data)
+
+def delete(path: str):
+    _schedule(path, None)
+
+def flush(timeout: float = 5.0) -> bool:
+    with _cond:
+        return _cond.wait_for(lambda: not _pending and not _writing, timeout)
+
+def get_metrics() -> Dict[str, int]:
+    with _cond:
+        metrics = dict(_metrics)
+        metrics["pending"] = len(_pending)
+    return metrics
@@ -0,0 +1,305 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import config
+import instrument_locks
+import order_executor
+import order_templates
+import position_tracker
+
+logger = logging.getLogger(__name__)
+
+ENTRY_STYLES = ("legs", "bracket")
+OPPOSITE = {"buy": "sell", "sell": "buy"}
+DIRECTION = {"buy": "long", "sell": "short"}
+BIAS = {"buy": "bullish", "sell": "bearish"}
+
+def builtin_specs() -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": "gold",
+            "label": "Gold",
+            "ticker": config.GOLD_TICKER,
+            "quantity": config.GOLD_QUANTITY,
+            "url": config.GOLD_WEBHOOK_URL,
+            "slot": position_tracker.GOLD,
+            "state_file": config.GOLD_ORDER_FILE,
+            "stop_points": config.GOLD_STOP_POINTS,
+            "target_points": config.GOLD_DEFAULT_TARGET_POINTS,
+            "entry": "legs",
+        },
+        {
+            "name": "nq",
+            "label": "NQ",
+            "ticker": config.NQ_TICKER,
+            "quantity": config.NQ_QUANTITY,
+            "url": config.NQ_WEBHOOK_URL,
+            "slot": position_tracker.NQ,
+            "state_file": config.NQ_ORDER_FILE,
+            "stop_points": config.NQ_STOP_POINTS,
+            "target_points": config.NQ_TAKE_PROFIT_POINTS,
+            "entry": "bracket",
+        },
+    ]
+
+def load_specs(path: str = "") -> List[Dict[str, Any]]:
+    specs = {spec["name"]: spec for spec in builtin_specs()}
+    if path:
+        with open(path, 'r') as f:
+            for spec in json.load(f):
+                specs[spec["name"]] = {**specs.get(spec["name"], {}), **spec}
+    return list(specs.values())
+
+def _whole(points: float) -> Union[int, float]:
+    return int(points) if points.is_integer() else points
+
+class Strategy:
+    __slots__ = (
+        "name", "label", "ticker", "quantity", "quantity_text", "url", "urls", "slot", "stop_points",
+        "target_points", "bracketed", "source", "entry_orders", "target_orders", "stop_orders",
+        "reduce_orders", "bracket_orders", "exit_order",
+    )
+
+    def __init__(self, spec: Dict[str, Any]):
+        missing = [key for key in ("name", "ticker", "quantity", "stop_points", "target_points") if key not in spec]
+        if missing:
+            raise ValueError(f"Strategy spec {spec.get('name', '?')} is missing {', '.join(missing)}")
+        entry = spec.get("entry", "legs")
+        if entry not in ENTRY_STYLES:
+            raise ValueError(f"Strategy {spec['name']}: entry must be one of {', '.join(ENTRY_STYLES)}, got {entry}")
+
+        self.name = spec["name"]
+        self.label = spec.get("label", self.name.upper())
+        self.ticker = spec["ticker"]
+        self.quantity = int(spec["quantity"])
+        self.quantity_text = str(self.quantity)
+        self.url = spec.get("url", "")
+        self.urls = [self.url]
+        self.slot = spec.get("slot", self.name)
+        self.stop_points = float(spec["stop_points"])
+        self.target_points = float(spec["target_points"])
+        self.bracketed = entry == "bracket"
+        self.source = f"{self.name}_webhook"
+
+        self.entry_orders = order_templates.market_entry(self.ticker)
+        self.target_orders = order_templates.limit_target(self.ticker)
+        self.stop_orders = order_templates.timed_stop(self.ticker)
+        self.reduce_orders = order_templates.reduce(self.ticker)
+        self.bracket_orders = order_templates.broker_bracket(self.ticker)
+        self.exit_order = order_templates.flatten(self.ticker)
+        position_tracker.register_slot(self.slot, spec.get("state_file", f"open_{self.name}_order.json"), self.ticker)
+
+    def validate(self, payload: Dict[str, Any]) -> Optional[str]:
+        action = payload.get("action")
+        if not action:
+            return "Action is required"
+        if action not in ACTIONS:
+            return f"Unknown action: {action}. Supported actions: {', '.join(ACTIONS)}"
+        if action in PRICED_ACTIONS and not payload.get("price"):
+            return f"Price is required for {action} action"
+        return None
+
+    async def process(self, payload: Dict[str, Any], timestamp: str) -> Dict[str, Any]:
+        error = self.validate(payload)
+        if error:
+            return {
+                "status": "error",
+                "message": error,
+                "timestamp": timestamp
+            }
+        return await ACTIONS[payload["action"]](self, payload, timestamp)
+
+    def _entry_legs(self, action: str, price: str, stop_price: float, target: Optional[str]):
+        opposite = OPPOSITE[action]
+        entry = order_executor.OrderLeg(
+            self.entry_orders[action].render(price=price, quantity=self.quantity_text),
+            f"{self.label} {BIAS[action]} entry webhook",
+            is_entry_trade=True,
+            additional_context={"source": self.source, "direction": DIRECTION[action]},
+        )
+        exits = []
+        if target:
+            exits.append(order_executor.OrderLeg(
+                self.target_orders[opposite].render(price=target, quantity=self.quantity_text),
+                f"{self.label} target webhook"
+            ))
+            logger.info("%s target webhook queued at price: %s for quantity: %s", self.label, target, self.quantity_text)
+        exits.append(order_executor.OrderLeg(
+            self.stop_orders[opposite].render(
+                time=datetime.now().isoformat(" ", "microseconds"),
+                stopPrice=str(stop_price),
+                quantity=self.quantity_text
+            ),
+            f"{self.label} stop webhook"
+        ))
+        logger.info("%s stop webhook queued at price: %s (%s points from entry %s)", self.label, stop_price, self.stop_points, price)
+        return entry, exits
+
+    def _entry_bracket(self, action: str, signal_price: float, target: Optional[str]):
+        take_profit_amount = abs(float(target) - signal_price) if target else _whole(self.target_points)
+        if not target:
+            logger.info("No target provided, using default take profit amount: %s points", take_profit_amount)
+        entry = order_executor.OrderLeg(
+            self.bracket_orders[action].render(
+                signalPrice=signal_price,
+                quantity=self.quantity_text,
+                takeProfitAmount=take_profit_amount,
+                stopLossAmount=_whole(self.stop_points)
+            ),
+            f"{self.label} {BIAS[action]} entry bracket webhook",
+            is_entry_trade=True,
+            additional_context={"source": self.source, "direction": DIRECTION[action]},
+        )
+        return entry, []
+
+    async def enter(self, action: str, price: str, target: Optional[str] = None) -> Optional[str]:
+        async with instrument_locks.hold_async(self.ticker):
+            if position_tracker.has(self.slot):
+                logger.info("%s order already open, skipping new order submission", self.label)
+                return None
+
+            logger.info("%s %s entry received with price: %s", self.label, BIAS[action], price)
+            try:
+                signal_price = float(price)
+                sign = 1 if action == "buy" else -1
+                stop_price = signal_price - sign * self.stop_points
+                if self.bracketed:
+                    entry, exits = self._entry_bracket(action, signal_price, target)
+                else:
+                    entry, exits = self._entry_legs(action, price, stop_price, target)
+
+                bracket = await order_executor.submit_bracket_async(
+                    self.ticker,
+                    self.urls,
+                    entry,
+                    exits,
+                    wait=not config.BRACKET_SUBMISSION
+                )
+                logger.info("%s %s entry bracket %s submitted (%s)", self.label, BIAS[action], bracket.bracket_id, bracket.status)
+
+                position_tracker.save(self.slot, {
+                    "action": action,
+                    "ticker": self.ticker,
+                    "price": price,
+                    "quantity": self.quantity,
+                    "stop": str(stop_price),
+                    "target": target if target else str(signal_price + sign * self.target_points),
+                    "bracket_id": bracket.bracket_id,
+                })
+                logger.info("%s order saved locally", self.label)
+                return bracket.bracket_id
+
+            except Exception as e:
+                logger.error("Error processing %s %s entry: %s", self.label, BIAS[action], e)
+                return None
+
+    async def take_partial_profit(self, quantity: Optional[str] = None):
+        async with instrument_locks.hold_async(self.ticker):
+            logger.info("%s 50%% target hit received", self.label)
+            if not position_tracker.has(self.slot):
+                logger.info("No open %s order to close for 50%% target hit", self.label)
+                return
+
+            try:
+                order_info = position_tracker.get(self.slot)
+                if not order_info:
+                    logger.warning("Could not retrieve %s order info for 50%% target hit", self.label)
+                    return
+
+                opposite = OPPOSITE[order_info["order_info"]["action"]]
+                entry_price = order_info["order_info"]["price"]
+                target_quantity = quantity if quantity else str(int(self.quantity / 2))
+
+                await order_executor.send_webhook_to_multiple_urls_async(
+                    self.reduce_orders[opposite].render(quantity=target_quantity),
+                    self.urls,
+                    f"{self.label} 50% target hit webhook"
+                )
+                logger.info("%s 50%% target hit webhook sent successfully (opposite action: %s)", self.label, opposite)
+
+                remaining_quantity = self.quantity - int(target_quantity)
+                if remaining_quantity > 0:
+                    order_info["order_info"]["quantity"] = remaining_quantity
+                    position_tracker.save(self.slot, order_info["order_info"])
+                    logger.info("%s order updated with remaining quantity: %s", self.label, remaining_quantity)
+
+                    stop_price = float(entry_price)
+                    await order_executor.send_webhook_to_multiple_urls_async(
+                        self.stop_orders[opposite].render(
+                            time=datetime.now().isoformat(" ", "microseconds"),
+                            stopPrice=str(stop_price),
+                            quantity=str(remaining_quantity)
+                        ),
+                        self.urls,
+                        f"{self.label} 50% target stop order webhook"
+                    )
+                    logger.info("Stop order placed at entry price %s for %s contract(s)", stop_price, remaining_quantity)
+                else:
+                    position_tracker.clear(self.slot)
+                    logger.info("%s order cleared after 50%% target hit", self.label)
+
+            except Exception as e:
+                logger.error("Error processing %s 50%% target hit: %s", self.label, e)
+
+    async def exit(self):
+        async with instrument_locks.hold_async(self.ticker):
+            logger.info("%s exit received", self.label)
+            try:
+                await order_executor.send_webhook_to_multiple_urls_async(self.exit_order.render(), self.urls, f"{self.label} exit webhook")
+                logger.info("%s exit webhook sent successfully", self.label)
+
+                position_tracker.clear(self.slot)
+                logger.info("%s order cleared after exit", self.label)
+
+            except Exception as e:
+                logger.error("Error processing %s exit: %s", self.label, e)
+
+def _entry_action(action: str) -> Callable[[Strategy, Dict[str, Any], str], Awaitable[Dict[str, Any]]]:
+    async def run(strategy: Strategy, payload: Dict[str, Any], timestamp: str) -> Dict[str, Any]:
+        bracket_id = await strategy.enter(action, payload["price"], payload.get("target_50"))
+        response = {
+            "status": "success",
+            "message": f"{strategy.label} {BIAS[action]} entry processed successfully",
+            "timestamp": timestamp
+        }
+        if bracket_id:
+            response["bracket_id"] = bracket_id
+        return response
+    return run
+
+async def _exit_action(strategy: Strategy, payload: Dict[str, Any], timestamp: str) -> Dict[str, Any]:
+    await strategy.exit()
+    return {
+        "status": "success",
+        "message": f"{strategy.label} exit processed successfully",
+        "timestamp": timestamp
+    }
+
+ACTIONS: Dict[str, Callable[[Strategy, Dict[str, Any], str], Awaitable[Dict[str, Any]]]] = {
+    "bullish_entry": _entry_action("buy"),
+    "bearish_entry": _entry_action("sell"),
+    "exit": _exit_action,
+}
+PRICED_ACTIONS = {"bullish_entry", "bearish_entry"}
+
+STRATEGIES: Dict[str, Strategy] = {}
+_by_slot: Dict[str, Strategy] = {}
+
+def load(path: Optional[str] = None) -> Dict[str, Strategy]:
+    global STRATEGIES, _by_slot
+    strategies = {}
+    for spec in load_specs(config.STRATEGY_SPECS_FILE if path is None else path):
+        strategy = Strategy(spec)
+        strategies[strategy.name] = strategy
+    STRATEGIES = strategies
+    _by_slot = {strategy.slot: strategy for strategy in strategies.values()}
+    logger.debug("Loaded strategies: %s", ", ".join(strategies))
+    return strategies
+
+def get(name: str) -> Optional[Strategy]:
+    return STRATEGIES.get(name)
+
+def for_slot(slot: str) -> Optional[Strategy]:
+    return _by_slot.get(slot)
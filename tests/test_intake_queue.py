@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import intake_queue
+
+BROKER = """
+import asyncio, json, sys, time
+import httpx
+import order_executor
+
+HANG_ON = sys.argv[1]
+
+async def handler(request):
+    if request.method != "POST":
+        return httpx.Response(200)
+    body = json.loads(request.content)
+    with open("legs.jsonl", "a") as f:
+        f.write(json.dumps({"phase": HANG_ON, "order_type": body.get("orderType"), "key": request.headers.get("idempotency-key")}) + "\\n")
+    if body.get("orderType") == HANG_ON:
+        open("hung", "w").close()
+        await asyncio.Event().wait()
+    return httpx.Response(200, json={"ok": True})
+
+order_executor._clients["http://broker.test"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+import main, order_ledger
+order_ledger.load()
+intake_queue = main.intake_queue
+intake_queue.start(main.execute_intake)
+if HANG_ON == "stop":
+    print(intake_queue.accept(main.BATCH_PROCESSORS["gold"][0], "gold", {"action": "bullish_entry", "price": "2000"}, "t"), flush=True)
+    asyncio.run(asyncio.Event().wait())
+intake_id = sys.argv[2]
+for _ in range(200):
+    status = intake_queue.status(intake_id)
+    if status is not None and status["state"] == "done":
+        break
+    time.sleep(0.05)
+intake_queue.stop()
+order_ledger.close()
+print(json.dumps(status), flush=True)
+"""
+
+def _env():
+    return {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "INTAKE_QUEUE": "true",
+        "BRACKET_SUBMISSION": "true",
+        "GOLD_WEBHOOK_URL": "http://broker.test/gold",
+        "NTFY_TOPIC": "",
+    }
+
+def _legs(path, phase):
+    with open(path) as f:
+        return [leg for leg in map(json.loads, f) if leg["phase"] == phase]
+
+def test_signal_killed_mid_bracket_is_replayed(tmp_path):
+    script = tmp_path / "broker.py"
+    script.write_text(BROKER)
+    child = subprocess.Popen([sys.executable, str(script), "stop"], cwd=tmp_path, env=_env(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        intake_id = child.stdout.readline().strip()
+        deadline = time.monotonic() + 20
+        while not (tmp_path / "hung").exists():
+            assert time.monotonic() < deadline, "bracket never reached the stop leg"
+            time.sleep(0.05)
+        time.sleep(0.3)
+    finally:
+        child.kill()
+        child.wait()
+
+    outstanding = [entry["id"] for entry in intake_queue._read_journal(str(tmp_path / "intake_queue.jsonl"))]
+    assert intake_id in outstanding
+
+    replay = subprocess.run([sys.executable, str(script), "none", intake_id], cwd=tmp_path, env=_env(), capture_output=True, text=True, timeout=60)
+    status = json.loads(replay.stdout.strip().splitlines()[-1])
+    assert status["state"] == "done"
+    assert status["result"]["status"] == "success"
+
+    first = {leg["key"] for leg in _legs(tmp_path / "legs.jsonl", "stop")}
+    second = _legs(tmp_path / "legs.jsonl", "none")
+    assert "stop" in [leg["order_type"] for leg in second]
+    assert {leg["key"] for leg in second} <= first
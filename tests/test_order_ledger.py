@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SENDER = """
+import asyncio, json, sys, threading, time
+import httpx
+import order_executor
+
+PHASE = sys.argv[1]
+PAYLOAD = {"action": "exit", "time": "2026-01-05T14:30:00Z"}
+
+async def handler(request):
+    if request.method != "POST":
+        return httpx.Response(200)
+    with open("legs.jsonl", "a") as f:
+        f.write(json.dumps({"phase": PHASE, "key": request.headers.get("idempotency-key")}) + "\\n")
+    await asyncio.sleep(0.5)
+    return httpx.Response(200, json={"ok": True})
+
+order_executor._clients["http://broker.test"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+from fastapi.testclient import TestClient
+import main
+
+with TestClient(main.app) as client:
+    responses = []
+    if PHASE == "first":
+        sender = threading.Thread(target=lambda: responses.append(client.post("/gold", json=PAYLOAD).json()["status"]))
+        sender.start()
+        time.sleep(0.2)
+    responses.append(client.post("/gold", json=PAYLOAD).json()["status"])
+    if PHASE == "first":
+        sender.join()
+    skipped = sum(float(line.split()[-1]) for line in client.get("/metrics").text.splitlines() if line.startswith("order_ledger_skipped_total"))
+print(json.dumps({"responses": responses, "skipped": skipped}), flush=True)
+"""
+
+def _env():
+    return {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "INTAKE_QUEUE": "false",
+        "GOLD_WEBHOOK_URL": "http://broker.test/gold",
+    }
+
+def _run(script, cwd, phase):
+    result = subprocess.run([sys.executable, str(script), phase], cwd=cwd, env=_env(), capture_output=True, text=True, timeout=60)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_redelivery_after_read_timeout_is_skipped(tmp_path):
+    script = tmp_path / "sender.py"
+    script.write_text(SENDER)
+
+    first = _run(script, tmp_path, "first")
+    assert first["responses"] == ["success", "success"]
+    assert first["skipped"] == 1
+
+    restarted = _run(script, tmp_path, "restarted")
+    assert restarted["skipped"] == 1
+
+    with open(tmp_path / "legs.jsonl") as f:
+        legs = [json.loads(line) for line in f]
+    assert [leg["phase"] for leg in legs] == ["first"]
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+import csv_logger
+
+EXECUTED_ACTIONS = ("buy", "sell", "exit")
+RESTING_ORDER_TYPES = ("stop", "limit")
+
+@dataclass
+class Journal:
+    timestamp: np.ndarray
+    ticker: np.ndarray
+    action: np.ndarray
+    quantity: np.ndarray
+    price: np.ndarray
+    order_type: np.ndarray
+    source: np.ndarray
+    result: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def select(self, mask: np.ndarray) -> "Journal":
+        return Journal(*(getattr(self, name)[mask] for name in self.__dataclass_fields__))
+
+@dataclass
+class Fills:
+    timestamp: np.ndarray
+    ticker: np.ndarray
+    price: np.ndarray
+
+def _floats(values: List[str]) -> np.ndarray:
+    column = np.asarray(values, dtype=object)
+    column[column == ""] = "nan"
+    return column.astype(float)
+
+def _seconds(values: List[str]) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[us]").astype(np.int64) / 1e6
+
+def journal_paths(directory: str = ".") -> List[str]:
+    base, ext = os.path.splitext(csv_logger.CSV_LOG_FILE)
+    return sorted(glob.glob(os.path.join(directory, f"{base}*{ext}")))
+
+def load_journal(paths: List[str]) -> Journal:
+    columns: Dict[str, List[str]] = {name: [] for name in csv_logger.CSV_HEADER}
+    for path in paths:
+        with open(path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                continue
+            positions = [header.index(name) for name in csv_logger.CSV_HEADER]
+            for row in reader:
+                if len(row) < len(header):
+                    continue
+                for name, position in zip(csv_logger.CSV_HEADER, positions):
+                    columns[name].append(row[position])
+
+    timestamp = _seconds(columns["timestamp"])
+    order = np.argsort(timestamp, kind="stable")
+    return Journal(
+        timestamp=timestamp[order],
+        ticker=np.asarray(columns["ticker"], dtype=str)[order],
+        action=np.char.lower(np.asarray(columns["action"], dtype=str))[order],
+        quantity=_floats(columns["quantity"])[order],
+        price=_floats(columns["price"])[order],
+        order_type=np.char.lower(np.asarray(columns["order_type"], dtype=str))[order],
+        source=np.asarray(columns["source"], dtype=str)[order],
+        result=np.asarray(columns["result"], dtype=str)[order],
+    )
+
+def load_fills(path: str) -> Fills:
+    timestamps, tickers, prices = [], [], []
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            timestamps.append(row.get("time") or row["timestamp"])
+            tickers.append(row["ticker"])
+            prices.append(row["price"])
+    timestamp = _seconds(timestamps)
+    order = np.argsort(timestamp, kind="stable")
+    return Fills(timestamp[order], np.asarray(tickers, dtype=str)[order], _floats(prices)[order])
+
+def _match_fills(timestamps: np.ndarray, fills: Optional[Fills], ticker: str, window: float) -> np.ndarray:
+    matched = np.full(len(timestamps), np.nan)
+    if fills is None:
+        return matched
+    mask = fills.ticker == ticker
+    fill_times = fills.timestamp[mask]
+    fill_prices = fills.price[mask]
+    if not fill_times.size:
+        return matched
+    index = np.searchsorted(fill_times, timestamps, side="left")
+    valid = index < fill_times.size
+    valid[valid] &= fill_times[index[valid]] - timestamps[valid] <= window
+    matched[valid] = fill_prices[index[valid]]
+    return matched
+
+def _positions(side: np.ndarray, quantity: np.ndarray, is_exit: np.ndarray) -> np.ndarray:
+    requested = np.where(is_exit, 0.0, side * np.nan_to_num(quantity))
+    running = np.cumsum(requested)
+    segment = np.concatenate(([0], np.cumsum(is_exit)[:-1]))
+    base = np.concatenate(([0.0], running[is_exit]))
+    open_at_exit = running - base[segment]
+    return np.where(is_exit, -open_at_exit, requested)
+
+def _drawdown(equity: np.ndarray) -> float:
+    if not equity.size:
+        return 0.0
+    peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    return float((peak - equity).max())
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if values.size else None
+
+def analyze_ticker(journal: Journal, ticker: str, fills: Optional[Fills] = None, match_window: float = 60.0) -> Dict[str, Any]:
+    rows = journal.select(journal.ticker == ticker)
+    succeeded = rows.result == "success"
+    executed = succeeded & np.isin(rows.action, EXECUTED_ACTIONS) & ~np.isin(rows.order_type, RESTING_ORDER_TYPES)
+    trades = rows.select(executed)
+
+    side = np.where(trades.action == "buy", 1.0, np.where(trades.action == "sell", -1.0, 0.0))
+    is_exit = trades.action == "exit"
+    signed = _positions(side, trades.quantity, is_exit)
+    active = signed != 0
+    timestamp = trades.timestamp[active]
+    signal_price = trades.price[active]
+    signed = signed[active]
+
+    fill_price = _match_fills(timestamp, fills, ticker, match_window)
+    price = np.where(np.isnan(fill_price), signal_price, fill_price)
+    slippage = (fill_price - signal_price) * np.sign(signed)
+    slippage = slippage[~np.isnan(slippage)]
+
+    position_after = np.cumsum(signed)
+    position_before = position_after - signed
+    opens = position_before == 0
+    point_value = config.POINT_VALUES.get(ticker, 1.0)
+
+    stats: Dict[str, Any] = {
+        "orders": int(len(rows)),
+        "failed_orders": int(np.count_nonzero(~succeeded & (rows.result != ""))),
+        "resting_orders": int(np.count_nonzero(succeeded & np.isin(rows.order_type, RESTING_ORDER_TYPES))),
+        "executions": int(signed.size),
+        "open_position": float(position_after[-1]) if signed.size else 0.0,
+        "slippage_mean_points": float(slippage.mean()) if slippage.size else None,
+        "slippage_p95_points": _percentile(slippage, 95),
+        "slippage_samples": int(slippage.size),
+    }
+    if not signed.size:
+        stats.update(trades=0, closed_trades=0, unpriced_trades=0, wins=0, losses=0, win_rate=None,
+                     realized_points=0.0, realized_pnl=0.0, average_win=None, average_loss=None,
+                     profit_factor=None, max_drawdown=0.0, exposure_seconds=0.0, exposure_ratio=0.0,
+                     average_hold_seconds=None)
+        return stats
+
+    trade_id = np.cumsum(opens) - 1
+    first = np.flatnonzero(opens)
+    last = np.concatenate((first[1:] - 1, [signed.size - 1]))
+    pnl_points = np.bincount(trade_id, weights=-signed * price, minlength=first.size)
+    closed = position_after[last] == 0
+    priced = ~np.isnan(pnl_points)
+    realized = closed & priced
+    duration = timestamp[last] - timestamp[first]
+
+    pnl = pnl_points[realized] * point_value
+    wins = pnl > 0
+    losses = pnl < 0
+    gross_loss = -pnl[losses].sum()
+    span = timestamp[-1] - timestamp[0]
+
+    stats.update(
+        trades=int(first.size),
+        closed_trades=int(np.count_nonzero(closed)),
+        unpriced_trades=int(np.count_nonzero(closed & ~priced)),
+        wins=int(np.count_nonzero(wins)),
+        losses=int(np.count_nonzero(losses)),
+        win_rate=float(wins.mean()) if pnl.size else None,
+        realized_points=float(pnl_points[realized].sum()),
+        realized_pnl=float(pnl.sum()),
+        average_win=float(pnl[wins].mean()) if wins.any() else None,
+        average_loss=float(pnl[losses].mean()) if losses.any() else None,
+        profit_factor=float(pnl[wins].sum() / gross_loss) if gross_loss else None,
+        max_drawdown=_drawdown(np.cumsum(pnl)),
+        exposure_seconds=float(duration[closed].sum()),
+        exposure_ratio=float(duration[closed].sum() / span) if span else 0.0,
+        average_hold_seconds=float(duration[closed].mean()) if closed.any() else None,
+    )
+    return stats
+
+def analyze(journal: Journal, fills: Optional[Fills] = None, match_window: float = 60.0) -> Dict[str, Dict[str, Any]]:
+    return {
+        str(ticker): analyze_ticker(journal, ticker, fills, match_window)
+        for ticker in np.unique(journal.ticker)
+        if ticker
+    }
+
+def _format(value: Any, digits: int = 2) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+def print_report(report: Dict[str, Dict[str, Any]]):
+    columns = [
+        ("trades", "closed_trades", 0),
+        ("win%", "win_rate", 1),
+        ("points", "realized_points", 2),
+        ("P&L", "realized_pnl", 2),
+        ("PF", "profit_factor", 2),
+        ("max DD", "max_drawdown", 2),
+        ("exposure%", "exposure_ratio", 1),
+        ("slip pts", "slippage_mean_points", 3),
+        ("open", "open_position", 0),
+    ]
+    print(f"{'ticker':<10}" + "".join(f"{title:>12}" for title, _, _ in columns))
+    for ticker, stats in report.items():
+        cells = []
+        for _, key, digits in columns:
+            value = stats.get(key)
+            if key in ("win_rate", "exposure_ratio") and value is not None:
+                value *= 100
+            cells.append(f"{_format(value, digits):>12}")
+        print(f"{ticker:<10}" + "".join(cells))
+        if stats["unpriced_trades"]:
+            print(f"{'':<10}{stats['unpriced_trades']} closed trade(s) without a price on every leg were excluded")
+
+def main():
+    parser = argparse.ArgumentParser(description="P&L and performance analytics over the trades.csv journal")
+    parser.add_argument("paths", nargs="*", help="journal files (default: trades*.csv in the current directory)")
+    parser.add_argument("--fills", help="CSV of actual fills (time,ticker,price) for slippage and fill-price P&L")
+    parser.add_argument("--match-window", type=float, default=60.0, help="seconds after an order within which a fill is matched to it")
+    parser.add_argument("--since", help="only include orders at or after this ISO timestamp")
+    parser.add_argument("--until", help="only include orders before this ISO timestamp")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    paths = args.paths or journal_paths()
+    if not paths:
+        raise SystemExit("No trade journal files found")
+    journal = load_journal(paths)
+    if args.since:
+        journal = journal.select(journal.timestamp >= _seconds([args.since])[0])
+    if args.until:
+        journal = journal.select(journal.timestamp < _seconds([args.until])[0])
+    fills = load_fills(args.fills) if args.fills else None
+
+    report = analyze(journal, fills, args.match_window)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()